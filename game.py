@@ -5,13 +5,32 @@
 import os
 import sys
 
-import json, math, random, shutil, time, threading, asyncio
+import json, math, random, shutil, time, threading, asyncio, heapq
 from datetime import date
 import wave
 import io
 import base64
 import struct
 
+# ---------- STARTUP PROFILE ----------
+# python game.py --profile-startup prints how long each startup phase took, then exits at the first main menu frame.
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+_startup_t0 = time.perf_counter()
+_startup_marks = []
+
+def startup_mark(phase):
+    """Record that a startup phase just finished (only kept with --profile-startup)."""
+    if PROFILE_STARTUP:
+        _startup_marks.append((phase, time.perf_counter()))
+
+def report_startup_profile():
+    prev = _startup_t0
+    print("Startup profile (ms):")
+    for phase, t in _startup_marks:
+        print(f"  {phase:<32} {(t - prev) * 1000:8.1f}")
+        prev = t
+    print(f"  {'total to first main menu frame':<32} {(prev - _startup_t0) * 1000:8.1f}")
+
 
 def _ensure_dependencies():
     """Ensure pygame is installed. Auto-create venv and install if missing."""
@@ -68,9 +87,10 @@ def _ensure_dependencies():
 
 
 _ensure_dependencies()
+startup_mark("dependency check (imports pygame)")
 
-# Headless safe mode for server (no window needed)
-if "--server" in sys.argv:
+# Headless safe mode for server and benchmark (no window needed)
+if "--server" in sys.argv or "--benchmark" in sys.argv:
     os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
 
 try:
@@ -78,8 +98,15 @@ try:
 except Exception:
     websockets = None
 
+try:
+    import numpy as np  # optional: fast sound synthesis
+except Exception:
+    np = None
+startup_mark("optional imports")
+
 import pygame  # type: ignore[import-untyped]
 pygame.init()
+startup_mark("pygame.init")
 
 # ---------- DATA DIR (saves/settings live in app data, not cwd) ----------
 _data_dir_cached = None
@@ -112,6 +139,12 @@ def _get_data_dir():
     _data_dir_cached = d
     return d
 
+def _get_cache_dir():
+    """Regenerable data (synthesized audio, decoded assets). Safe to delete."""
+    d = os.path.join(_get_data_dir(), "cache")
+    os.makedirs(d, exist_ok=True)
+    return d
+
 def _atomic_write_json(path, data):
     """Write JSON atomically: temp file -> rename -> backup copy."""
     dirpath = os.path.dirname(path)
@@ -267,7 +300,7 @@ def get_difficulty_count_mult():
     return 1.0
 
 def load_settings():
-    out = {"volume": 0.7, "fullscreen": True, "hit_sounds": True, "music": True, "tutorial_completed": False, "difficulty": "Normal", "player_name": "", "server_url": ""}
+    out = {"volume": 0.7, "fullscreen": True, "hit_sounds": True, "music": True, "tutorial_completed": False, "difficulty": "Normal", "player_name": "", "server_url": "", "dirty_rects": False, "render_height": "auto", "max_fps": 60, "horde_mode": False}
     path = get_settings_path()
     data = _load_json_with_backup(path)
     if data:
@@ -281,6 +314,20 @@ def load_settings():
             out["difficulty"] = "Normal"
         out["player_name"] = str(data.get("player_name", "")).strip()[:64]
         out["server_url"] = str(data.get("server_url", "")).strip()
+        out["dirty_rects"] = bool(data.get("dirty_rects", False))
+        rh = data.get("render_height", "auto")
+        if rh in ("auto", "native"):
+            out["render_height"] = rh
+        else:
+            try:
+                out["render_height"] = max(240, int(rh))
+            except (TypeError, ValueError):
+                out["render_height"] = "auto"
+        try:
+            out["max_fps"] = max(0, int(data.get("max_fps", 60)))
+        except (TypeError, ValueError):
+            out["max_fps"] = 60
+        out["horde_mode"] = bool(data.get("horde_mode", False))
     return out
 
 def save_settings():
@@ -291,14 +338,98 @@ def save_settings():
 
 settings = load_settings()
 
+# ---------- Modal overlays ----------
+# Modal screens darken whatever is behind them with a full-screen translucent overlay. Overlays and
+# plain-background backdrops are built once per (size, colour) and dropped when the display mode changes.
+_overlay_cache = {}
+_flame_archer_scaled = {}  # (w, h) -> smoothscaled Flame Archer picture; sized from the display, so dropped with it
+
+def overlay_surface(rgba):
+    """Shared full-screen SRCALPHA surface filled with rgba."""
+    key = ("overlay", WIDTH, HEIGHT, tuple(rgba))
+    surf = _overlay_cache.get(key)
+    if surf is None:
+        surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        surf.fill(rgba)
+        _overlay_cache[key] = surf
+    return surf
+
+def modal_backdrop(rgba):
+    """bg_color with the rgba overlay already composited, for modals drawn over an empty screen."""
+    key = ("backdrop", WIDTH, HEIGHT, tuple(bg_color), tuple(rgba))
+    surf = _overlay_cache.get(key)
+    if surf is None:
+        surf = pygame.Surface((WIDTH, HEIGHT)).convert()
+        surf.fill(bg_color)
+        surf.blit(overlay_surface(rgba), (0, 0))
+        _overlay_cache[key] = surf
+    return surf
+
+def snapshot_backdrop(rgba):
+    """Freeze the frame currently on screen under an rgba overlay, for modals opened over gameplay."""
+    snap = screen.copy()
+    snap.blit(overlay_surface(rgba), (0, 0))
+    return snap
+
+# ---------- Render target ----------
+# Everything draws to `screen` at WIDTH x HEIGHT. When the window is taller than the render height
+# (settings "render_height": "auto" caps it at DEFAULT_HEIGHT, a number sets it, "native" disables
+# scaling) `screen` is an offscreen surface with the window's aspect ratio that present() scales
+# up into `window`, so per-pixel effect costs do not grow with the display resolution.
+# Mouse positions from get_mouse_pos() / get_events() are mapped back into render coordinates.
+window = None
+
+def render_size_for(win_w, win_h):
+    mode = settings.get("render_height", "auto")
+    if mode == "native":
+        return win_w, win_h
+    target_h = DEFAULT_HEIGHT if mode == "auto" else int(mode)
+    if win_h <= target_h:
+        return win_w, win_h
+    return max(1, round(win_w * target_h / win_h)), target_h
+
 def apply_display_mode():
-    global screen, WIDTH, HEIGHT
+    global screen, window, WIDTH, HEIGHT
+    _overlay_cache.clear()
+    _flame_archer_scaled.clear()
     if settings.get("fullscreen", True):
-        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        WIDTH, HEIGHT = screen.get_size()
+        window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        window = pygame.display.set_mode((DEFAULT_WIDTH, DEFAULT_HEIGHT))
+    WIDTH, HEIGHT = render_size_for(*window.get_size())
+    if (WIDTH, HEIGHT) == window.get_size():
+        screen = window
     else:
-        WIDTH, HEIGHT = DEFAULT_WIDTH, DEFAULT_HEIGHT
-        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+
+def present():
+    """Show the finished frame: scale the render target into the window if needed, then flip."""
+    if screen is not window:
+        pygame.transform.scale(screen, window.get_size(), window)
+    pygame.display.flip()
+
+def to_render_pos(pos):
+    if screen is window:
+        return pos
+    win_w, win_h = window.get_size()
+    return (pos[0] * WIDTH // win_w, pos[1] * HEIGHT // win_h)
+
+def get_mouse_pos():
+    return to_render_pos(pygame.mouse.get_pos())
+
+def get_events():
+    """get_events() with mouse positions in render coordinates."""
+    events = pygame.event.get()
+    if screen is window:
+        return events
+    win_w, win_h = window.get_size()
+    for k, ev in enumerate(events):
+        if ev.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            attrs = dict(ev.dict, pos=to_render_pos(ev.pos))
+            if ev.type == pygame.MOUSEMOTION:
+                attrs["rel"] = (ev.rel[0] * WIDTH // win_w, ev.rel[1] * HEIGHT // win_h)
+            events[k] = pygame.event.Event(ev.type, attrs)
+    return events
 
 def get_save_path(slot=None):
     s = current_save_slot if slot is None else int(slot)
@@ -318,6 +449,7 @@ apply_display_mode()
 pygame.display.set_caption("Infinite Archer")
 clock = pygame.time.Clock()
 FPS = 60
+startup_mark("settings + display")
 
 # ---------- SOUND ----------
 _sounds = {}
@@ -327,9 +459,20 @@ try:
     _mixer_ok = True
 except Exception:
     pass
+startup_mark("mixer init")
+
+SAMPLE_RATE = 44100
+MUSIC_LOOP_SEC = 16.0
+# Simple ambient: slow minor progression (Am - Em - F - G), soft pad-like tones
+MUSIC_CHORDS = [
+    (220, 0.06), (261.63, 0.05), (329.63, 0.05),  # Am
+    (164.81, 0.06), (196, 0.05), (246.94, 0.05),   # Em
+    (174.61, 0.06), (220, 0.05), (261.63, 0.05),   # F
+    (196, 0.06), (246.94, 0.05), (293.66, 0.05),   # G
+]
 
 def _make_tone(freq, duration_sec=0.08, volume=0.2):
-    sample_rate = 44100
+    sample_rate = SAMPLE_RATE
     n_frames = int(sample_rate * duration_sec)
     buf = io.BytesIO()
     with wave.open(buf, "wb") as w:
@@ -345,7 +488,7 @@ def _make_tone(freq, duration_sec=0.08, volume=0.2):
 
 def _make_arrow_sound():
     """Short bow/arrow release: quick high-to-mid pitch, 0.05s."""
-    sample_rate = 44100
+    sample_rate = SAMPLE_RATE
     n_frames = int(sample_rate * 0.05)
     buf = io.BytesIO()
     with wave.open(buf, "wb") as w:
@@ -362,44 +505,150 @@ def _make_arrow_sound():
         w.writeframes(b"".join(frames))
     return buf.getvalue()
 
-def _init_sounds():
-    if not _mixer_ok:
-        return
+# NumPy versions of the synths above: same samples, computed as whole arrays (mono int16).
+def _tone_samples_np(freq, duration_sec=0.08, volume=0.2):
+    t = np.arange(int(SAMPLE_RATE * duration_sec)) / SAMPLE_RATE
+    s = 32767 * volume * np.sin(2 * np.pi * freq * t)
+    return np.clip(s.astype(np.int32), -32768, 32767).astype(np.int16)
+
+def _arrow_samples_np():
+    t = np.arange(int(SAMPLE_RATE * 0.05)) / SAMPLE_RATE
+    freq = 320 - (120 * t / 0.05)
+    s = 32767 * 0.2 * np.sin(2 * np.pi * freq * t)
+    return np.clip(s.astype(np.int32), -32768, 32767).astype(np.int16)
+
+def _music_samples_np(start=0, stop=None):
+    """Music loop samples [start, stop) as mono int16 (the loop is identical on both channels)."""
+    if stop is None:
+        stop = int(SAMPLE_RATE * MUSIC_LOOP_SEC)
+    t = np.arange(start, stop) / SAMPLE_RATE
+    table = np.array(MUSIC_CHORDS, dtype=np.float64)
+    idx = (t * 0.5).astype(np.int64) % len(MUSIC_CHORDS)
+    freq = table[idx, 0]
+    vol = table[idx, 1]
+    s = 32767 * vol * (0.6 * np.sin(2 * np.pi * freq * t) + 0.4 * np.sin(2 * np.pi * freq * 1.5 * t))
+    return np.clip(s.astype(np.int32), -32768, 32767).astype(np.int16)
+
+def _sound_from_samples(samples):
+    """Build a Sound straight from mono int16 samples, duplicated to the mixer's channel count."""
+    channels = pygame.mixer.get_init()[2]
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return pygame.mixer.Sound(array=np.ascontiguousarray(samples))
+
+def _sound_from_wav(wav_bytes):
+    return pygame.mixer.Sound(file=io.BytesIO(wav_bytes))
+
+def _numpy_audio_ok():
+    """Array-fed sounds need numpy and a 16-bit mixer at our sample rate."""
+    if np is None:
+        return False
     try:
-        _sounds["shoot"] = pygame.mixer.Sound(buffer=io.BytesIO(_make_tone(380, 0.06, 0.15)))
-        _sounds["arrow"] = pygame.mixer.Sound(buffer=io.BytesIO(_make_arrow_sound()))
-        _sounds["hit"] = pygame.mixer.Sound(buffer=io.BytesIO(_make_tone(180, 0.05, 0.2)))
-        _sounds["levelup"] = pygame.mixer.Sound(buffer=io.BytesIO(_make_tone(520, 0.12, 0.22)))
-        _sounds["death"] = pygame.mixer.Sound(buffer=io.BytesIO(_make_tone(120, 0.35, 0.3)))
-        _sounds["menu_click"] = pygame.mixer.Sound(buffer=io.BytesIO(_make_tone(280, 0.04, 0.18)))
+        freq, size, _channels = pygame.mixer.get_init()
+        return freq == SAMPLE_RATE and size == -16
     except Exception:
-        pass
+        return False
 
-if _mixer_ok:
-    _init_sounds()
+# ---------- AUDIO CACHE ----------
+# Synthesized sounds are stored as raw mixer-format PCM under cache/, keyed by what produced them.
+# Bump AUDIO_CACHE_VERSION whenever a synth above changes its output.
+AUDIO_CACHE_VERSION = 1
 
-def _make_music_loop():
-    """Generate a short looping background track (calm, ambient) for menu/game. ~16s loop."""
-    sample_rate = 44100
-    duration_sec = 16.0
-    n_frames = int(sample_rate * duration_sec) * 2  # stereo
+def _audio_cache_path(kind, params):
+    import hashlib
+    key = json.dumps([kind, list(params), SAMPLE_RATE, list(pygame.mixer.get_init()), AUDIO_CACHE_VERSION])
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(_get_cache_dir(), f"audio-{digest}.pcm")
+
+def _load_cached_sound(path):
+    """Memory-map a cached PCM buffer into a Sound; None if missing or unreadable."""
+    import mmap
+    try:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return pygame.mixer.Sound(buffer=mm)
+    except Exception:
+        return None
+
+def _store_cached_sound(path, sound):
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(sound.get_raw())
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+
+def _cached_sound(kind, params, build):
+    """Load (kind, params) from the audio cache, or build it with build() and store it."""
+    try:
+        path = _audio_cache_path(kind, params)
+    except Exception:
+        return build()
+    snd = _load_cached_sound(path)
+    if snd is None:
+        snd = build()
+        _store_cached_sound(path, snd)
+    return snd
+
+def _build_effect_sound(spec):
+    if _numpy_audio_ok():
+        samples = _arrow_samples_np() if spec is None else _tone_samples_np(*spec)
+        return _sound_from_samples(samples)
+    wav_bytes = _make_arrow_sound() if spec is None else _make_tone(*spec)
+    return _sound_from_wav(wav_bytes)
+
+SOUND_SPECS = {
+    "shoot": (380, 0.06, 0.15),
+    "arrow": None,
+    "hit": (180, 0.05, 0.2),
+    "levelup": (520, 0.12, 0.22),
+    "death": (120, 0.35, 0.3),
+    "menu_click": (280, 0.04, 0.18),
+}
+
+def _init_sounds():
+    if not _mixer_ok:
+        return
+    for name, spec in SOUND_SPECS.items():
+        try:
+            if spec is None:
+                _sounds[name] = _cached_sound("arrow", (0.05,), lambda: _build_effect_sound(None))
+            else:
+                _sounds[name] = _cached_sound("tone", spec, lambda spec=spec: _build_effect_sound(spec))
+        except Exception:
+            pass
+
+_sounds_ready = False
+
+def _ensure_sounds():
+    """Sound effects are synthesized (or loaded from the audio cache) on first use, not at import."""
+    global _sounds_ready
+    if not _sounds_ready:
+        _sounds_ready = True
+        _init_sounds()
+
+def _make_music_loop(start=0, stop=None):
+    """Generate a short looping background track (calm, ambient) for menu/game. ~16s loop.
+    start/stop select a frame range of the loop (used when streaming it in chunks)."""
+    sample_rate = SAMPLE_RATE
+    duration_sec = MUSIC_LOOP_SEC
+    if stop is None:
+        stop = int(sample_rate * duration_sec)
     buf = io.BytesIO()
     with wave.open(buf, "wb") as w:
         w.setnchannels(2)
         w.setsampwidth(2)
         w.setframerate(sample_rate)
         frames = []
-        # Simple ambient: slow minor progression (Am - Em - F - G), soft pad-like tones
-        for i in range(int(sample_rate * duration_sec)):
+        for i in range(start, stop):
             t = i / sample_rate
             beat = t * 0.5  # 2 beats per 4 sec
-            chord = [
-                (220, 0.06), (261.63, 0.05), (329.63, 0.05),  # Am
-                (164.81, 0.06), (196, 0.05), (246.94, 0.05),   # Em
-                (174.61, 0.06), (220, 0.05), (261.63, 0.05),   # F
-                (196, 0.06), (246.94, 0.05), (293.66, 0.05),   # G
-            ][int(beat) % 12]
-            freq, vol = chord
+            freq, vol = MUSIC_CHORDS[int(beat) % 12]
             s = int(32767 * vol * (0.6 * math.sin(2 * math.pi * freq * t) + 0.4 * math.sin(2 * math.pi * freq * 1.5 * t)))
             s = max(-32768, min(32767, s))
             frames.append(struct.pack("h", s))
@@ -407,11 +656,83 @@ def _make_music_loop():
         w.writeframes(b"".join(frames))
     return buf.getvalue()
 
+def _build_music_chunk(start, stop):
+    if _numpy_audio_ok():
+        return _sound_from_samples(_music_samples_np(start, stop))
+    return _sound_from_wav(_make_music_loop(start, stop))
+
+def _iter_music_chunks(chunk_sec=1.0):
+    """Yield the music loop as consecutive short Sounds, synthesized on demand."""
+    total = int(SAMPLE_RATE * MUSIC_LOOP_SEC)
+    step = max(1, int(SAMPLE_RATE * chunk_sec))
+    for start in range(0, total, step):
+        yield _build_music_chunk(start, min(total, start + step))
+
 _music_sound = None
 _music_playing = False
+_music_loop_sound = None  # completed synthesized loop, kept so restarts skip synthesis
+_music_channel = None
+_music_stream_stop = None  # threading.Event of the active streaming worker
+_music_lock = threading.Lock()
+
+def _synth_music_volume():
+    return settings.get("volume", 0.7) * 0.35
+
+def _music_stream_worker(stop_event):
+    """Start the synthesized loop from its first chunk and keep the channel's queue fed:
+    remaining chunks in order while they are produced, then the completed buffer on repeat.
+    Volume is set on the channel (see apply_music_volume), so the chunks stay at full volume."""
+    global _music_sound, _music_loop_sound, _music_channel
+    chunks = []
+    fed = 0
+    channel = None
+    playing = None  # the sound at the front of the channel once its queue is empty
+    loop = None
+    gen = _iter_music_chunks()
+    try:
+        while not stop_event.is_set():
+            idle = 0.05
+            chunk = next(gen, None) if loop is None else None
+            if chunk is not None:
+                chunks.append(chunk)
+            elif loop is None:
+                loop = pygame.mixer.Sound(buffer=b"".join(c.get_raw() for c in chunks))
+                _store_cached_sound(_audio_cache_path("music_loop", (MUSIC_LOOP_SEC,)), loop)
+                with _music_lock:
+                    _music_loop_sound = loop
+                    if not stop_event.is_set():
+                        _music_sound = loop
+            with _music_lock:
+                if stop_event.is_set():
+                    return
+                if channel is None:
+                    channel = chunks[0].play()
+                    if channel is None:
+                        return
+                    channel.set_volume(_synth_music_volume())
+                    _music_channel = channel
+                    playing = chunks[0]
+                    fed = 1
+                elif channel.get_queue() is None:
+                    nxt = None
+                    if fed < len(chunks):
+                        nxt = chunks[fed]
+                        fed += 1
+                    elif loop is not None:
+                        nxt = loop
+                    if nxt is not None:
+                        channel.queue(nxt)
+                        # An empty queue means `playing` has just started; the queue cannot empty
+                        # again before it ends, so sleep for most of its length instead of polling.
+                        idle = max(0.05, playing.get_length() - 0.25)
+                        playing = nxt
+            if loop is not None:
+                stop_event.wait(idle)
+    except Exception:
+        pass
 
 def start_background_music():
-    global _music_sound, _music_playing
+    global _music_sound, _music_playing, _music_loop_sound, _music_stream_stop
     if not _mixer_ok or not settings.get("music", True):
         return
     try:
@@ -427,29 +748,60 @@ def start_background_music():
                 return
         if _music_playing:
             return
-        loop_buf = _make_music_loop()
-        _music_sound = pygame.mixer.Sound(buffer=io.BytesIO(loop_buf))
-        _music_sound.set_volume(settings.get("volume", 0.7) * 0.35)
-        _music_sound.play(loops=-1)
+        volume = _synth_music_volume()
+        if _music_loop_sound is None:
+            _music_loop_sound = _load_cached_sound(_audio_cache_path("music_loop", (MUSIC_LOOP_SEC,)))
+        if _music_loop_sound is not None:
+            _music_sound = _music_loop_sound
+            _music_sound.set_volume(volume)
+            _music_sound.play(loops=-1)
+        else:
+            # Nothing cached yet: synthesize off the main thread and start on the first chunk
+            _music_stream_stop = threading.Event()
+            threading.Thread(target=_music_stream_worker, args=(_music_stream_stop,), daemon=True).start()
         _music_playing = True
     except Exception:
         pass
 
 def stop_background_music():
-    global _music_sound, _music_playing
+    global _music_sound, _music_playing, _music_channel, _music_stream_stop
     if not _mixer_ok:
         return
     try:
         pygame.mixer.music.stop()
-        if _music_sound is not None:
-            _music_sound.stop()
-            _music_sound = None
+        with _music_lock:
+            if _music_stream_stop is not None:
+                _music_stream_stop.set()
+                _music_stream_stop = None
+            if _music_channel is not None:
+                _music_channel.stop()
+                _music_channel = None
+            if _music_sound is not None:
+                _music_sound.stop()
+                _music_sound = None
         _music_playing = False
     except Exception:
         pass
 
+def apply_music_volume():
+    """Apply settings["volume"] to the music that is playing now (file, cached loop or stream)."""
+    if not _mixer_ok:
+        return
+    try:
+        pygame.mixer.music.set_volume(settings.get("volume", 0.7) * 0.5)
+        with _music_lock:
+            if _music_channel is not None:
+                _music_channel.set_volume(_synth_music_volume())
+            elif _music_sound is not None:
+                _music_sound.set_volume(_synth_music_volume())
+    except Exception:
+        pass
+
 def play_sound(name):
-    if not _mixer_ok or name not in _sounds:
+    if not _mixer_ok:
+        return
+    _ensure_sounds()
+    if name not in _sounds:
         return
     if name == "hit" and not settings.get("hit_sounds", True):
         return
@@ -476,10 +828,12 @@ BLUE = (40,140,255)
 BROWN = (139,69,19)
 ACID_YELLOW = (200,230,50)
 
-FONT_LG = pygame.font.SysFont(None, 84)
-FONT_MD = pygame.font.SysFont(None, 44)
-FONT_SM = pygame.font.SysFont(None, 28)
-FONT_XS = pygame.font.SysFont(None, 16)  # orb amount (small box when enemy dies)
+# Default font via Font(None): same face as SysFont(None) without the system font scan at startup
+FONT_LG = pygame.font.Font(None, 84)
+FONT_MD = pygame.font.Font(None, 44)
+FONT_SM = pygame.font.Font(None, 28)
+FONT_XS = pygame.font.Font(None, 16)  # orb amount (small box when enemy dies)
+startup_mark("fonts")
 
 RARITY_COLORS = {
     "Common": (0,200,0),
@@ -571,40 +925,76 @@ def draw_button(rect, label, font=FONT_MD, hover=False, border_color=BLACK, text
     txt = font.render(label_fit, True, text_color)
     screen.blit(txt, (rect.x + (rect.w - txt.get_width()) // 2, rect.y + (rect.h - txt.get_height()) // 2))
 
+# Text fitting: widths come from font.size (no rasterizing) memoized per font, and finished
+# wrap/truncate results are cached by (font, text, width) so per-frame HUD and button text is a lookup.
+_text_width_cache = {}  # font -> {text: width}
+_fit_text_cache = {}    # (kind, font, text, width, extra) -> lines / truncated text
+TEXT_CACHE_MAX = 4096
+
+def text_width(font, text):
+    """Pixel width of text in font (memoized)."""
+    widths = _text_width_cache.get(font)
+    if widths is None:
+        widths = _text_width_cache[font] = {}
+    w = widths.get(text)
+    if w is None:
+        if len(widths) >= TEXT_CACHE_MAX:
+            widths.clear()
+        w = widths[text] = font.size(text)[0]
+    return w
+
+def _fit_text_cached(key, build):
+    result = _fit_text_cache.get(key)
+    if result is None:
+        if len(_fit_text_cache) >= TEXT_CACHE_MAX:
+            _fit_text_cache.clear()
+        result = _fit_text_cache[key] = build()
+    return result
+
 def wrap_text_to_width(font, text, max_pixel_width):
     """Return list of lines that fit within max_pixel_width."""
     if not text:
         return []
-    words = text.split()
+    return list(_fit_text_cached(("wrap", font, text, max_pixel_width, None),
+                                 lambda: _wrap_text_lines(font, text, max_pixel_width)))
+
+def _wrap_text_lines(font, text, max_pixel_width):
     lines = []
-    current = []
-    for w in words:
-        trial = " ".join(current + [w]) if current else w
-        if font.render(trial, True, BLACK).get_width() <= max_pixel_width:
-            current.append(w)
+    line = ""
+    for w in text.split():
+        trial = line + " " + w if line else w
+        if font.size(trial)[0] <= max_pixel_width:
+            line = trial
         else:
-            if current:
-                lines.append(" ".join(current))
-            current = [w] if font.render(w, True, BLACK).get_width() <= max_pixel_width else []
-            if current == []:
+            if line:
+                lines.append(line)
+            line = w if text_width(font, w) <= max_pixel_width else ""
+            if not line:
                 lines.append(w)
-                current = []
-    if current:
-        lines.append(" ".join(current))
-    return lines
+    if line:
+        lines.append(line)
+    return tuple(lines)
 
 def truncate_text_to_width(font, text, max_pixel_width, ellipsis="…"):
     """Return text truncated to fit max_pixel_width (with ellipsis if truncated)."""
     if not text:
         return ""
-    if font.render(text, True, BLACK).get_width() <= max_pixel_width:
+    return _fit_text_cached(("trunc", font, text, max_pixel_width, ellipsis),
+                            lambda: _truncate_text(font, text, max_pixel_width, ellipsis))
+
+def _truncate_text(font, text, max_pixel_width, ellipsis):
+    if font.size(text)[0] <= max_pixel_width:
         return text
-    ellipsis_w = font.render(ellipsis, True, BLACK).get_width()
-    allow_w = max_pixel_width - ellipsis_w
-    for i in range(len(text), 0, -1):
-        if font.render(text[:i], True, BLACK).get_width() <= allow_w:
-            return text[:i] + ellipsis
-    return ellipsis
+    allow_w = max_pixel_width - text_width(font, ellipsis)
+    # Longest prefix that fits: binary search, since prefix width grows with length
+    lo, hi = 0, len(text) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if font.size(text[:mid])[0] <= allow_w:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + ellipsis if lo else ellipsis
 
 # ---------- ONLINE (CLIENT) ----------
 # Fixes:
@@ -865,13 +1255,16 @@ class NetClient:
             return dict(self.players), dict(self.enemies), list(self.shots), list(self.chat)
 
 # ---------- ONLINE (SERVER) ----------
-import sqlite3
-
 SERVER_DB_PATH = "infinite_archer.db"
 
 
+def _db_connect():
+    import sqlite3  # server only; the client never loads it
+    return sqlite3.connect(SERVER_DB_PATH)
+
+
 def _db_init():
-    conn = sqlite3.connect(SERVER_DB_PATH)
+    conn = _db_connect()
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS saves (
             user_id TEXT NOT NULL, slot INTEGER NOT NULL, data TEXT NOT NULL, updated_at REAL NOT NULL,
@@ -885,7 +1278,7 @@ def _db_init():
 
 
 def _db_save(user_id, slot, data, kind):
-    conn = sqlite3.connect(SERVER_DB_PATH)
+    conn = _db_connect()
     now = time.time()
     tbl = "saves" if kind == "save" else "meta"
     conn.execute(
@@ -898,7 +1291,7 @@ def _db_save(user_id, slot, data, kind):
 
 
 def _db_load(user_id, slot, kind):
-    conn = sqlite3.connect(SERVER_DB_PATH)
+    conn = _db_connect()
     tbl = "saves" if kind == "save" else "meta"
     row = conn.execute(f"SELECT data FROM {tbl} WHERE user_id = ? AND slot = ?", (user_id, slot)).fetchone()
     conn.close()
@@ -906,14 +1299,14 @@ def _db_load(user_id, slot, kind):
 
 
 def _db_meta_all(user_id):
-    conn = sqlite3.connect(SERVER_DB_PATH)
+    conn = _db_connect()
     rows = conn.execute("SELECT slot, data FROM meta WHERE user_id = ?", (user_id,)).fetchall()
     conn.close()
     return {slot: json.loads(data) for slot, data in rows}
 
 
 def _db_delete_save(user_id, slot):
-    conn = sqlite3.connect(SERVER_DB_PATH)
+    conn = _db_connect()
     conn.execute("DELETE FROM saves WHERE user_id = ? AND slot = ?", (user_id, slot))
     conn.execute("DELETE FROM meta WHERE user_id = ? AND slot = ?", (user_id, slot))
     conn.commit()
@@ -1265,11 +1658,15 @@ async def run_server(host="0.0.0.0", port=8765, tick_hz=20):
 
 # ---------- GAME CLASSES ----------
 class Enemy:
+    __slots__ = ("rect", "etype", "is_mini", "color", "speed", "hp", "damage", "max_hp",
+                 "burn_ms_left", "poison_ms_left", "slow_until_ms", "slowed", "next_status_ms",
+                 "alive", "shoot_timer", "shoot_interval", "_killed_by_burn_dot", "_mastery_credit", "px", "py")
+    is_boss = False
+
     def __init__(self, rect, etype="normal", is_mini=False, hp_override=None):
         self.rect = rect
         self.etype = etype
         self.is_mini = is_mini
-        self.is_boss = False
 
         if etype=="normal": base_hp,base_speed,base_damage,color=20,2,10,RED
         elif etype=="fast": base_hp,base_speed,base_damage,color=15,3,8,YELLOW
@@ -1292,17 +1689,21 @@ class Enemy:
         self.burn_ms_left = 0
         self.poison_ms_left = 0
         self.slow_until_ms = 0
-        self.last_status_tick = 0
+        self.slowed = False
+        self.next_status_ms = 0
+        self.alive = True
         self.shoot_timer = 0
         self.shoot_interval = 1800 + random.randint(-400,400)
-        self.summon_timer = 0
+        self._killed_by_burn_dot = False
+        self._mastery_credit = True  # False when the killing blow came from a source Flame mastery ignores
+        self.px, self.py = rect.x, rect.y  # rect.topleft before the current simulation step
 
     def move_towards(self, tx, ty):
         dx, dy = tx - self.rect.centerx, ty - self.rect.centery
         dist = math.hypot(dx, dy)
         if dist==0: return
         spd = self.speed*(0.5 if self.poison_ms_left>0 else 1.0)
-        if getattr(self, "slow_until_ms", 0) and pygame.time.get_ticks() < self.slow_until_ms:
+        if self.slowed:
             spd *= 0.4
         self.rect.x += round(spd*dx/dist)
         self.rect.y += round(spd*dy/dist)
@@ -1314,56 +1715,135 @@ class Enemy:
             dx,dy = player.centerx - self.rect.centerx, player.centery - self.rect.centery
             d = math.hypot(dx,dy) or 1
             vx,vy = 8*dx/d, 8*dy/d
-            proj = pygame.Rect(self.rect.centerx-4, self.rect.centery-4,8,8)
-            return {"rect":proj,"vx":vx,"vy":vy,"damage":DEFAULTS["archer_shot_damage"]}
+            return acquire_enemy_arrow(self.rect.centerx, self.rect.centery, 8, vx, vy, DEFAULTS["archer_shot_damage"])
         return None
 
-    def apply_status(self, now_ms):
+    def restart_status_tick(self, due_ms):
+        """Next burn/poison tick fires at due_ms; the latest call wins."""
+        self.next_status_ms = due_ms
+        schedule_enemy(self, due_ms, "status")
+
+    def slow(self, until_ms):
+        self.slow_until_ms = until_ms
+        self.slowed = True
+        schedule_enemy(self, until_ms, "slow_end")
+
+    def status_tick(self, now_ms):
+        if self.burn_ms_left <= 0 and self.poison_ms_left <= 0:
+            return
+        if self.burn_ms_left > 0:
+            self.hp -= 5
+            if self.hp <= 0:
+                self._killed_by_burn_dot = True
+            small_dots.append({"x": self.rect.centerx, "y": self.rect.top - 6, "color": ORANGE, "ttl": 40, "vy": -0.2})
+            floating_texts.append({"x": self.rect.centerx, "y": self.rect.top - 20, "txt": "-5", "color": ORANGE, "ttl": 1200, "vy": -0.6, "alpha": 255})
+            self.burn_ms_left = max(0, self.burn_ms_left - 1000)
+        if self.poison_ms_left > 0:
+            self.hp -= 5
+            small_dots.append({"x": self.rect.centerx, "y": self.rect.top - 6, "color": PURPLE, "ttl": 40, "vy": -0.2})
+            floating_texts.append({"x": self.rect.centerx, "y": self.rect.top - 20, "txt": "-5", "color": PURPLE, "ttl": 1200, "vy": -0.6, "alpha": 255})
+            self.poison_ms_left = max(0, self.poison_ms_left - 1000)
         if self.burn_ms_left > 0 or self.poison_ms_left > 0:
-            if self.last_status_tick == 0 or (now_ms - self.last_status_tick) >= 1000:
-                self.last_status_tick = now_ms
-                if self.burn_ms_left > 0:
-                    self.hp -= 5
-                    if self.hp <= 0:
-                        self._killed_by_burn_dot = True
-                    small_dots.append({"x": self.rect.centerx, "y": self.rect.top - 6, "color": ORANGE, "ttl": 40, "vy": -0.2})
-                    floating_texts.append({"x": self.rect.centerx, "y": self.rect.top - 20, "txt": "-5", "color": ORANGE, "ttl": 1200, "vy": -0.6, "alpha": 255})
-                    self.burn_ms_left = max(0, self.burn_ms_left - 1000)
-                if self.poison_ms_left > 0:
-                    self.hp -= 5
-                    small_dots.append({"x": self.rect.centerx, "y": self.rect.top - 6, "color": PURPLE, "ttl": 40, "vy": -0.2})
-                    floating_texts.append({"x": self.rect.centerx, "y": self.rect.top - 20, "txt": "-5", "color": PURPLE, "ttl": 1200, "vy": -0.6, "alpha": 255})
-                    self.poison_ms_left = max(0, self.poison_ms_left - 1000)
-        else:
-            self.last_status_tick = now_ms
+            self.restart_status_tick(now_ms + 1000)
+
+class Boss(Enemy):
+    """Wave-20 boss: a big tank that summons minis, fires heavy shots, slams and charges on timers."""
+    __slots__ = ("summon_timer", "summon_interval", "boss_shoot_timer", "boss_shoot_interval",
+                 "slam_timer", "slam_interval", "charge_timer", "charge_interval", "charge_until_ms", "charge_speed")
+    is_boss = True
+
+    def __init__(self, rect, now_ms):
+        super().__init__(rect, "tank", is_mini=False, hp_override=DEFAULTS["boss_hp"])
+        self.color = (120, 0, 50)
+        self.speed = 1.9
+        self.damage = DEFAULTS["archer_shot_damage"] * 12
+        self.summon_timer = now_ms + 3500
+        self.summon_interval = 3500
+        self.boss_shoot_timer = now_ms + 3000
+        self.boss_shoot_interval = 4200
+        self.slam_timer = now_ms + 4500
+        self.slam_interval = 6200
+        self.charge_timer = now_ms + 5000
+        self.charge_interval = 7500
+        self.charge_until_ms = 0
+        self.charge_speed = 11
+
+# A projectile that moves at most SWEPT_MIN_TARGET px per step cannot pass through the smallest target
+# (boss minis are 20x20, enemies 30x30, the player 40x40), so a discrete overlap test at its new
+# position is enough. Only faster movers pay for the swept test below.
+SWEPT_MIN_TARGET = 20
+
+def needs_sweep(vx, vy):
+    """True if a projectile with this per-step velocity could skip over a target between steps."""
+    return vx * vx + vy * vy > SWEPT_MIN_TARGET * SWEPT_MIN_TARGET
+
+def swept_first_hit(x0, y0, x1, y1, w, h, sweep, rects):
+    """Index of the rect first touched by a w x h box whose center moved from (x0, y0) to (x1, y1), or -1.
+
+    sweep is the union of the box's start and end rects. It is the broadphase: one collidelistall
+    rejects the usual no-hit case at the cost of a discrete collidelist. Each candidate then gets an
+    exact segment-vs-AABB test (the rect grown by the box size, clipped against the center path).
+    """
+    hits = sweep.collidelistall(rects)
+    if not hits:
+        return -1
+    return swept_nearest(x0, y0, x1, y1, w, h, rects, hits)
+
+def swept_nearest(x0, y0, x1, y1, w, h, rects, hits):
+    """Narrowphase of swept_first_hit for broadphase candidates hits (indices into rects)."""
+    if len(hits) == 1:
+        # usual case: nothing to order, just confirm the path really enters the rect
+        i = hits[0]
+        return i if rects[i].inflate(w, h).clipline(x0, y0, x1, y1) else -1
+    best, best_d = -1, 0
+    for i in hits:
+        clip = rects[i].inflate(w, h).clipline(x0, y0, x1, y1)
+        if clip:
+            d = (clip[0][0] - x0) ** 2 + (clip[0][1] - y0) ** 2
+            if best < 0 or d < best_d:
+                best, best_d = i, d
+    return best
 
 class Arrow:
     # Optional curving target for Mad Scientist
+    # x/y are the sub-pixel center; px/py the center before the last update (for swept hits);
+    # swept is set at reset from the speed (homing turns keep it) and picks the collision test
+    __slots__ = ("rect", "sweep", "x", "y", "px", "py", "vx", "vy", "swept", "angle", "pierce_remaining", "target", "turn_rate", "color", "damage_override")
+
     def __init__(self, x, y, tx, ty, pierce=0, target=None, turn_rate=0.22, color=BLACK):
         self.rect = pygame.Rect(0,0,30,6)
+        self.sweep = pygame.Rect(0,0,30,6)
+        self.reset(x, y, tx, ty, pierce, target, turn_rate, color)
+
+    def reset(self, x, y, tx, ty, pierce=0, target=None, turn_rate=0.22, color=BLACK):
         dx,dy = tx-x, ty-y
         d = math.hypot(dx,dy) or 1.0
         self.vx = DEFAULTS["arrow_speed"]*dx/d
         self.vy = DEFAULTS["arrow_speed"]*dy/d
-        self.rect.center = (x, y)  # always start at player, not offset toward cursor
+        self.swept = needs_sweep(self.vx, self.vy)
+        self.x = self.px = float(x)  # always start at player, not offset toward cursor
+        self.y = self.py = float(y)
+        self.rect.center = (x, y)
+        self.sweep.update(self.rect)
         self.angle = math.atan2(self.vy, self.vx)
         self.pierce_remaining = pierce
         self.target = target
         self.turn_rate = float(turn_rate)
         self.color = color
+        self.damage_override = None
 
     def update(self):
         if self.target is not None:
             try:
-                if getattr(self.target, "hp", 1) <= 0 or self.target not in enemies:
+                if self.target.hp <= 0 or not self.target.alive:
                     self.target = None
             except Exception:
                 self.target = None
 
         if self.target is not None:
             tx, ty = self.target.rect.centerx, self.target.rect.centery
-            dx = tx - self.rect.centerx
-            dy = ty - self.rect.centery
+            dx = tx - self.x
+            dy = ty - self.y
             d = math.hypot(dx,dy) or 1.0
             desired_vx = DEFAULTS["arrow_speed"]*dx/d
             desired_vy = DEFAULTS["arrow_speed"]*dy/d
@@ -1375,10 +1855,25 @@ class Arrow:
             self.vx *= scale
             self.vy *= scale
 
-        self.rect.x += int(self.vx)
-        self.rect.y += int(self.vy)
+        self.px, self.py = self.x, self.y
+        self.x += self.vx
+        self.y += self.vy
+        r = self.rect
+        self.sweep.update(r)
+        r.center = (round(self.x), round(self.y))
+        self.sweep.union_ip(r)
         self.angle = math.atan2(self.vy, self.vx)
-        return screen.get_rect().colliderect(self.rect)
+        return r.right > 0 and r.left < WIDTH and r.bottom > 0 and r.top < HEIGHT
+
+    def first_hit(self, rects):
+        """Index of the first rect this arrow passed through during its last update, or -1."""
+        if not self.swept:
+            return self.rect.collidelist(rects)
+        # swept_first_hit inlined: this runs for every fast arrow every step, so a miss costs one collidelistall
+        hits = self.sweep.collidelistall(rects)
+        if not hits:
+            return -1
+        return swept_nearest(self.px, self.py, self.x, self.y, self.rect.w, self.rect.h, rects, hits)
 
     def draw(self, surf):
         arr_surf = pygame.Surface((30,6), pygame.SRCALPHA)
@@ -1387,20 +1882,99 @@ class Arrow:
         surf.blit(rot,(self.rect.x,self.rect.y))
 
 class EnemyArrow:
-    def __init__(self,rect,vx,vy,dmg):
-        self.rect = rect
+    __slots__ = ("rect", "sweep", "x", "y", "px", "py", "vx", "vy", "swept", "damage")
+
+    def __init__(self, cx, cy, size, vx, vy, dmg):
+        self.rect = pygame.Rect(0, 0, size, size)
+        self.sweep = pygame.Rect(0, 0, size, size)
+        self.reset(cx, cy, size, vx, vy, dmg)
+    def reset(self, cx, cy, size, vx, vy, dmg):
+        self.rect.size = (size, size)
+        self.rect.center = (cx, cy)
+        self.sweep.update(self.rect)
+        self.x = self.px = float(cx)
+        self.y = self.py = float(cy)
         self.vx = vx
         self.vy = vy
+        self.swept = needs_sweep(vx, vy)
         self.damage = dmg
     def update(self):
-        self.rect.x += int(self.vx)
-        self.rect.y += int(self.vy)
-        return screen.get_rect().colliderect(self.rect)
+        self.px, self.py = self.x, self.y
+        self.x += self.vx
+        self.y += self.vy
+        r = self.rect
+        self.sweep.update(r)
+        r.center = (round(self.x), round(self.y))
+        self.sweep.union_ip(r)
+        return r.right > 0 and r.left < WIDTH and r.bottom > 0 and r.top < HEIGHT
+    def hits(self, target_rect):
+        """True if this projectile touched target_rect anywhere along its last move."""
+        if not self.swept:
+            return self.rect.colliderect(target_rect)
+        if not self.sweep.colliderect(target_rect):
+            return False
+        return swept_first_hit(self.px, self.py, self.x, self.y, self.rect.w, self.rect.h, self.sweep, (target_rect,)) >= 0
     def draw(self,surf):
         pygame.draw.rect(surf,DARK_RED,self.rect)
 
+# ---------- Projectile pools ----------
+# arrows / enemy_arrows are the dense active arrays; dead projectiles go back to a free list and are
+# re-initialised in place (rect included) by the next acquire. Removal is swap-with-last, so order
+# inside the active arrays is not meaningful.
+_arrow_pool = []
+_enemy_arrow_pool = []
+
+def acquire_arrow(x, y, tx, ty, pierce=0, target=None, turn_rate=0.22, color=BLACK):
+    if _arrow_pool:
+        a = _arrow_pool.pop()
+        a.reset(x, y, tx, ty, pierce, target, turn_rate, color)
+    else:
+        a = Arrow(x, y, tx, ty, pierce, target, turn_rate, color)
+    arrows.append(a)
+    return a
+
+def acquire_enemy_arrow(cx, cy, size, vx, vy, dmg):
+    if _enemy_arrow_pool:
+        ea = _enemy_arrow_pool.pop()
+        ea.reset(cx, cy, size, vx, vy, dmg)
+    else:
+        ea = EnemyArrow(cx, cy, size, vx, vy, dmg)
+    enemy_arrows.append(ea)
+    return ea
+
+def release_arrow_at(i):
+    a = arrows[i]
+    last = arrows.pop()
+    if last is not a:
+        arrows[i] = last
+    a.target = None
+    _arrow_pool.append(a)
+
+def release_enemy_arrow_at(j):
+    ea = enemy_arrows[j]
+    last = enemy_arrows.pop()
+    if last is not ea:
+        enemy_arrows[j] = last
+    _enemy_arrow_pool.append(ea)
+
+def release_enemy_arrow(ea):
+    try:
+        release_enemy_arrow_at(enemy_arrows.index(ea))
+    except ValueError:
+        pass
+
+def clear_projectiles():
+    for a in arrows:
+        a.target = None
+    _arrow_pool.extend(arrows)
+    _enemy_arrow_pool.extend(enemy_arrows)
+    arrows.clear()
+    enemy_arrows.clear()
+
 # Remote arrow visual (friends' arrows)
 class RemoteArrow:
+    __slots__ = ("x", "y", "vx", "vy", "ttl", "angle")
+
     def __init__(self, x, y, vx, vy, ttl_ms=900):
         self.x = float(x); self.y = float(y)
         self.vx = float(vx); self.vy = float(vy)
@@ -1438,7 +2012,7 @@ class FlameArcher(PlayerClass):
     def on_arrow_hit(self, enemy, damage):
         duration = FlameArcher.BURN_MS_BASE * 2 if globals().get("flame_mastery_unlocked", False) else FlameArcher.BURN_MS_BASE
         enemy.burn_ms_left = duration
-        enemy.last_status_tick = pygame.time.get_ticks()
+        enemy.restart_status_tick(pygame.time.get_ticks() + 1000)
 
 # ----- Additional Purchasable Classes -----
 class PoisonArcher(PlayerClass):
@@ -1446,7 +2020,7 @@ class PoisonArcher(PlayerClass):
     color = PURPLE
     def on_arrow_hit(self, enemy, damage):
         enemy.poison_ms_left = 3000
-        enemy.last_status_tick = pygame.time.get_ticks()
+        enemy.restart_status_tick(pygame.time.get_ticks() + 1000)
 
 class LightningArcher(PlayerClass):
     name = "Lightning Archer"
@@ -1455,28 +2029,20 @@ class LightningArcher(PlayerClass):
         # small chain effect to up to 2 nearby enemies
         ox, oy = enemy.rect.centerx, enemy.rect.centery
         lightning_lines.append({"x1": ox, "y1": oy, "x2": ox, "y2": oy, "ttl": 200})
-        others = [e for e in enemies if e is not enemy and getattr(e, "hp", 0) > 0]
-        others.sort(key=lambda e: math.hypot(e.rect.centerx - ox, e.rect.centery - oy))
-        hit = 0
-        for e in others:
-            if hit >= 2:
-                break
+        for e in nearest_enemies(ox, oy, 2, exclude=enemy):
             d = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
             if d <= 120:
                 dmg2 = max(1, int(damage * 0.5))
-                e.hp -= dmg2
-                floating_texts.append({"x": e.rect.centerx, "y": e.rect.top-12, "txt": f"-{dmg2}", "color": YELLOW, "ttl": 1000, "vy": -0.6, "alpha": 255})
+                deal_damage(e, dmg2, YELLOW)
                 lightning_lines.append({"x1": ox, "y1": oy, "x2": e.rect.centerx, "y2": e.rect.centery, "ttl": 260})
-                hit += 1
 
 class Ranger(PlayerClass):
     name = "Ranger"
     color = (40, 180, 120)
     # built-in double shot (doesn't require the Double Shot ability)
     def on_arrow_fire(self, mx, my):
-        a1 = Arrow(player.centerx, player.centery, mx, my - 10, pierce=pierce_level)
-        a2 = Arrow(player.centerx, player.centery, mx, my + 10, pierce=pierce_level)
-        arrows.append(a1); arrows.append(a2)
+        acquire_arrow(player.centerx, player.centery, mx, my - 10, pierce=pierce_level)
+        acquire_arrow(player.centerx, player.centery, mx, my + 10, pierce=pierce_level)
         return True
 
 class MadScientist(PlayerClass):
@@ -1493,33 +2059,26 @@ class MadScientist(PlayerClass):
             return False
         now_ms = pygame.time.get_ticks()
         overcharge = now_ms < globals().get("mad_scientist_overcharge_until_ms", 0)
-        sorted_enemies = sorted(enemies, key=lambda e: math.hypot(e.rect.centerx - player.centerx, e.rect.centery - player.centery))
         if overcharge:
-            targets = (sorted_enemies * 2)[:3]  # 3 arrows, repeat closest if fewer enemies
+            nearest = nearest_enemies(player.centerx, player.centery, 3)
+            targets = (nearest * 2)[:3]  # 3 arrows, repeat closest if fewer enemies
         else:
-            targets = sorted_enemies[:1]
+            targets = nearest_enemies(player.centerx, player.centery, 1)
         for t in targets:
-            arrows.append(Arrow(player.centerx, player.centery, t.rect.centerx, t.rect.centery, pierce=pierce_level, target=t, turn_rate=0.24, color=BLUE))
+            acquire_arrow(player.centerx, player.centery, t.rect.centerx, t.rect.centery, pierce=pierce_level, target=t, turn_rate=0.24, color=BLUE)
         return True
 
     def on_arrow_hit(self, enemy, damage):
         # Lab splash: deal bonus damage to closest other enemy in range
         ox, oy = enemy.rect.centerx, enemy.rect.centery
-        others = [e for e in enemies if e is not enemy and getattr(e, "hp", 0) > 0]
-        if not others:
+        nearest = nearest_enemies(ox, oy, 1, exclude=enemy)
+        if not nearest:
             return
-        closest = min(others, key=lambda e: math.hypot(e.rect.centerx - ox, e.rect.centery - oy))
+        closest = nearest[0]
         d = math.hypot(closest.rect.centerx - ox, closest.rect.centery - oy)
         if d <= self.SPLASH_RANGE:
             dmg2 = max(1, int(damage * self.SPLASH_RATIO))
-            closest.hp -= dmg2
-            floating_texts.append({"x": closest.rect.centerx, "y": closest.rect.top - 12, "txt": f"-{dmg2}", "color": (120, 255, 120), "ttl": 1000, "vy": -0.6, "alpha": 255})
-            if closest.hp <= 0:
-                record_assassin_kill(closest)
-                spawn_orb(closest.rect.centerx, closest.rect.centery, amount=1)
-                globals()["score"] += 1
-                try: enemies.remove(closest)
-                except: pass
+            deal_damage(closest, dmg2, (120, 255, 120), mastery_credit=False)
 
 class Robber(PlayerClass):
     """Secret class: 5 guns. Unlock by clicking Gems in class shop with >= 15000 gems. Replaces bow."""
@@ -1537,11 +2096,10 @@ class Knight(PlayerClass):
     def try_deflect(self, enemy_arrow):
         if globals().get("weapon","bow") != "sword":
             return False
-        try: enemy_arrows.remove(enemy_arrow)
-        except: pass
+        release_enemy_arrow(enemy_arrow)
         if enemies:
             closest = min(enemies, key=lambda e: math.hypot(e.rect.centerx - player.centerx, e.rect.centery - player.centery))
-            arrows.append(Arrow(player.centerx, player.centery, closest.rect.centerx, closest.rect.centery, pierce=pierce_level))
+            acquire_arrow(player.centerx, player.centery, closest.rect.centerx, closest.rect.centery, pierce=pierce_level)
         floating_texts.append({"x": player.centerx, "y": player.centery - 34, "txt": "DEFLECT!", "color": (120,120,120), "ttl": 40, "vy": -0.7, "alpha": 255})
         return True
 
@@ -1692,6 +2250,7 @@ def apply_daily_modifiers():
             ab = m["grant_ability"]
             if ab in owned_abilities:
                 owned_abilities[ab] = True
+    rebuild_hit_pipeline()
 
 def daily_gem_mult():
     """Multiplier for gem orbs when a daily modifier has gem_mult (e.g. Bounty Day)."""
@@ -1731,6 +2290,166 @@ def class_rarity_label(cls_name):
         return "Uncommon"
     return "Normal"
 
+# ---------- Orbs ----------
+# Pending orbs live in parallel x / y / amount arrays (numpy when available, plain lists otherwise)
+# rather than one dict per orb. New orbs are buffered and, when the field is next used, merged with
+# any orb in the same ORB_MERGE_CELL square into one orb worth their sum.
+ORB_MERGE_CELL = 16
+ORB_PICKUP_RADIUS = 20
+_orb_sprite_cache = {}
+
+def orb_sprite(amount):
+    """Blue orb box with its amount label, and the offset from the orb center to the blit position."""
+    sprite = _orb_sprite_cache.get(amount)
+    if sprite is None:
+        if len(_orb_sprite_cache) >= 256:
+            _orb_sprite_cache.clear()
+        txt = FONT_XS.render(str(amount), True, BLACK)
+        w, h = max(12, txt.get_width()), max(12, txt.get_height())
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.rect(surf, BLUE, ((w - 12) // 2, (h - 12) // 2, 12, 12))
+        surf.blit(txt, ((w - txt.get_width()) // 2, (h - txt.get_height()) // 2))
+        sprite = _orb_sprite_cache[amount] = (surf, w // 2, h // 2)
+    return sprite
+
+def _binomial(n, p):
+    """Number of successes in n independent trials with probability p."""
+    if n <= 0:
+        return 0
+    if hasattr(random, "binomialvariate"):  # Python 3.12+
+        return random.binomialvariate(n, p)
+    if np is not None:
+        return int(np.random.binomial(n, p))
+    return sum(1 for _ in range(n) if random.random() < p)
+
+class OrbField:
+    def __init__(self):
+        self._new = []  # (x, y, amount) not yet merged into the arrays
+        self.clear()
+
+    def clear(self):
+        self._new.clear()
+        if np is not None:
+            self.x = np.empty(0)
+            self.y = np.empty(0)
+            self.amount = np.empty(0, dtype=np.int64)
+        else:
+            self.x, self.y, self.amount = [], [], []
+
+    def __len__(self):
+        return len(self.amount) + len(self._new)
+
+    def add(self, x, y, amount=1):
+        self._new.append((float(x), float(y), int(amount)))
+
+    def _flush(self):
+        if not self._new:
+            return
+        nx, ny, na = zip(*self._new)
+        self._new.clear()
+        if np is None:
+            cells = {}
+            for x, y, a in zip(self.x + list(nx), self.y + list(ny), self.amount + list(na)):
+                c = cells.setdefault((int(x // ORB_MERGE_CELL), int(y // ORB_MERGE_CELL)), [0.0, 0.0, 0])
+                c[0] += x * a
+                c[1] += y * a
+                c[2] += a
+            self.x = [c[0] / c[2] for c in cells.values()]
+            self.y = [c[1] / c[2] for c in cells.values()]
+            self.amount = [c[2] for c in cells.values()]
+            return
+        x = np.concatenate((self.x, nx))
+        y = np.concatenate((self.y, ny))
+        a = np.concatenate((self.amount, np.array(na, dtype=np.int64)))
+        keys = np.floor(x / ORB_MERGE_CELL).astype(np.int64) * 1_000_003 + np.floor(y / ORB_MERGE_CELL).astype(np.int64)
+        _, inv = np.unique(keys, return_inverse=True)
+        total = np.bincount(inv, weights=a)
+        self.x = np.bincount(inv, weights=x * a) / total
+        self.y = np.bincount(inv, weights=y * a) / total
+        self.amount = total.astype(np.int64)
+
+    def pull(self, px, py):
+        """Move every orb toward (px, py); returns the amounts of orbs that reached it (now removed)."""
+        self._flush()
+        if len(self.amount) == 0:
+            return []
+        if np is None:
+            got, keep = [], ([], [], [])
+            for x, y, a in zip(self.x, self.y, self.amount):
+                dx, dy = px - x, py - y
+                dist = math.hypot(dx, dy) or 1.0
+                speed = 4 + min(8, dist / 20.0)
+                x += dx / dist * speed
+                y += dy / dist * speed
+                if math.hypot(x - px, y - py) < ORB_PICKUP_RADIUS:
+                    got.append(a)
+                else:
+                    keep[0].append(x); keep[1].append(y); keep[2].append(a)
+            self.x, self.y, self.amount = keep
+            return got
+        dx = px - self.x
+        dy = py - self.y
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1.0
+        step = (4 + np.minimum(8, dist / 20.0)) / dist
+        self.x += dx * step
+        self.y += dy * step
+        hit = np.hypot(self.x - px, self.y - py) < ORB_PICKUP_RADIUS
+        if not hit.any():
+            return []
+        got = self.amount[hit].tolist()
+        keep = ~hit
+        self.x, self.y, self.amount = self.x[keep], self.y[keep], self.amount[keep]
+        return got
+
+    def take_at(self, mx, my):
+        """Remove the first orb whose 16x16 box contains (mx, my); returns its amount or 0."""
+        self._flush()
+        for i, (x, y) in enumerate(zip(self.x, self.y)):
+            if x - 8 <= mx < x + 8 and y - 8 <= my < y + 8:
+                amount = int(self.amount[i])
+                if np is None:
+                    del self.x[i], self.y[i], self.amount[i]
+                else:
+                    self.x, self.y, self.amount = np.delete(self.x, i), np.delete(self.y, i), np.delete(self.amount, i)
+                return amount
+        return 0
+
+    def take_all(self):
+        """Remove every orb; returns their amounts."""
+        self._flush()
+        got = [int(a) for a in self.amount]
+        self.clear()
+        return got
+
+    def _sprites(self):
+        self._flush()
+        for x, y, a in zip(self.x, self.y, self.amount):
+            surf, ox, oy = orb_sprite(int(a))
+            yield surf, (int(x) - ox, int(y) - oy)
+
+    def draw(self, surface):
+        surface.blits(list(self._sprites()), False)
+
+    def rects(self):
+        return [surf.get_rect(topleft=pos) for surf, pos in self._sprites()]
+
+def collect_orbs(amounts):
+    """Award EXP and gems for collected orbs. Every orb unit rolls Bounty (+1 gem, 25%) and
+    Scavenger (+5 EXP, 20%); the rolls are drawn as one binomial sample each."""
+    global player_exp, gems, gems_this_run
+    units = sum(amounts)
+    if units <= 0:
+        return
+    gained = units * max(1, int(round(daily_gem_mult())))
+    if owned_abilities.get("Bounty", False):
+        gained += _binomial(units, 0.25)
+    player_exp += units
+    if owned_abilities.get("Scavenger", False):
+        player_exp += 5 * _binomial(units, 0.20)
+    gems += gained
+    gems_this_run += gained
+
 # ---------- GLOBALS ----------
 small_dots = []
 floating_texts = []
@@ -1739,7 +2458,7 @@ explosive_fx = []  # {cx, cy, ttl_ms} for Explosive 65px area visual
 arrows = []
 enemy_arrows = []
 enemies = []
-pending_orbs = []
+pending_orbs = OrbField()
 remote_arrows = []  # <-- friends arrows
 
 # Daily Challenge: one run per day with fixed modifiers; reward for reaching wave 5+
@@ -1905,14 +2624,14 @@ def trigger_hacker_command(cmd, now_ms):
     if cmd == "freeze" and now_ms >= hacker_freeze_cooldown_until_ms:
         hacker_freeze_cooldown_until_ms = now_ms + HACKER_FREEZE_COOLDOWN_MS
         for e in enemies:
-            e.slow_until_ms = now_ms + HACKER_FREEZE_DURATION_MS
+            e.slow(now_ms + HACKER_FREEZE_DURATION_MS)
         floating_texts.append({"x": player.centerx, "y": player.centery - 30, "txt": "Freeze All!", "color": (100, 200, 255), "ttl": 800, "vy": -0.5, "alpha": 255})
         return True
     if cmd == "flame" and now_ms >= hacker_flame_cooldown_until_ms:
         hacker_flame_cooldown_until_ms = now_ms + HACKER_FLAME_COOLDOWN_MS
         for e in enemies:
-            e.burn_ms_left = max(getattr(e, "burn_ms_left", 0), HACKER_FLAME_BURN_MS)
-            e.last_status_tick = 0
+            e.burn_ms_left = max(e.burn_ms_left, HACKER_FLAME_BURN_MS)
+            e.restart_status_tick(now_ms)
         floating_texts.append({"x": player.centerx, "y": player.centery - 30, "txt": "Flame All!", "color": ORANGE, "ttl": 800, "vy": -0.5, "alpha": 255})
         return True
     if cmd == "teleport" and now_ms >= hacker_teleport_cooldown_until_ms:
@@ -1940,8 +2659,8 @@ def record_flame_mastery_progress(enemy, dot_final_blow=False):
     global flame_mastery_kills_burning, flame_mastery_kills_dot_final, flame_mastery_bosses_burning, flame_mastery_unlocked
     if flame_mastery_unlocked:
         return
-    was_burning = getattr(enemy, "burn_ms_left", 0) > 0
-    is_boss = getattr(enemy, "is_boss", False)
+    was_burning = enemy.burn_ms_left > 0
+    is_boss = enemy.is_boss
     if was_burning:
         flame_mastery_kills_burning = min(1000, flame_mastery_kills_burning + 1)
     if dot_final_blow:
@@ -1956,8 +2675,8 @@ def record_assassin_kill(enemy):
     global assassin_active_bounties, assassin_completed_bounties, arrow_damage, max_hp, player_speed
     if not isinstance(player_class, Assassin) or not assassin_active_bounties:
         return
-    etype = getattr(enemy, "etype", "normal")
-    is_boss = getattr(enemy, "is_boss", False)
+    etype = enemy.etype
+    is_boss = enemy.is_boss
     assassin_kills[etype] = assassin_kills.get(etype, 0) + 1
     if is_boss:
         assassin_kills["boss"] = assassin_kills.get("boss", 0) + 1
@@ -2193,13 +2912,12 @@ def confirm_popup(message, yes_text="Yes", no_text="No"):
     btn_w, btn_h = 110, 44
     yes_rect = pygame.Rect(panel.centerx - btn_w - 24, panel.bottom - btn_h - 28, btn_w, btn_h)
     no_rect = pygame.Rect(panel.centerx + 24, panel.bottom - btn_h - 28, btn_w, btn_h)
+    backdrop = snapshot_backdrop(UI_OVERLAY_DARK)
     while True:
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_DARK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(backdrop, (0, 0))
         pygame.draw.rect(screen, UI_PANEL_BG, panel)
         pygame.draw.rect(screen, UI_BORDER, panel, 4)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         lines = wrap_text_to_width(FONT_MD, message, panel_w - 48)
         line_h = FONT_MD.render("Ay", True, UI_TEXT).get_height() + 6
         content_top = panel.y + 28
@@ -2215,8 +2933,8 @@ def confirm_popup(message, yes_text="Yes", no_text="No"):
             screen.blit(t, (panel.centerx - t.get_width()//2, y))
         draw_button(yes_rect, yes_text, hover=yes_rect.collidepoint(mx, my), text_color=UI_TEXT)
         draw_button(no_rect, no_text, hover=no_rect.collidepoint(mx, my), text_color=UI_TEXT)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return False
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -2456,9 +3174,10 @@ def load_game():
         if not found:
             player_class = NoClass()
 
-        enemies.clear(); arrows.clear(); enemy_arrows.clear(); pending_orbs.clear()
+        clear_enemies(); clear_projectiles(); pending_orbs.clear()
         remote_arrows.clear()
         floating_texts.clear(); small_dots.clear(); lightning_lines.clear(); explosive_fx.clear()
+        damage_events.clear(); kill_events.clear()
         chat_messages.clear()
         vampire_fly_until_ms = 0
         vampire_fly_cooldown_until_ms = 0
@@ -2492,6 +3211,7 @@ def load_game():
         daily_modifiers[:] = list(data.get("daily_modifiers", []))
         if not isinstance(player_class, Knight):
             weapon = "bow"
+        rebuild_hit_pipeline()
         return True
     except Exception as e:
         print("Load failed:", e)
@@ -2500,11 +3220,10 @@ def load_game():
 def hit_list_menu():
     """Assassin hit list: 3 bounties, timer until refresh. Close with button or Esc."""
     close_rect = pygame.Rect(WIDTH//2 - 100, HEIGHT - 80, 200, 50)
+    backdrop = snapshot_backdrop(UI_OVERLAY_DARK)
     while True:
         now_ms = pygame.time.get_ticks()
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_DARK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(backdrop, (0, 0))
         draw_text_centered(FONT_LG, "Hit List", 50, WHITE)
         if assassin_bounty_refresh_at_ms > now_ms:
             sec = (assassin_bounty_refresh_at_ms - now_ms) // 1000
@@ -2520,10 +3239,10 @@ def hit_list_menu():
             txt = FONT_MD.render(line_fit, True, WHITE)
             screen.blit(txt, (WIDTH//2 - txt.get_width()//2, y))
             y += 48
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         draw_button(close_rect, "Close", hover=close_rect.collidepoint(mx, my), border_color=(120, 124, 132), text_color=UI_TEXT)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -2541,17 +3260,16 @@ def pause_menu():
     resume_rect = pygame.Rect(center_x - btn_w//2, HEIGHT//2 - 80, btn_w, btn_h)
     save_rect   = pygame.Rect(center_x - btn_w//2, HEIGHT//2 - 10, btn_w, btn_h)
     quit_rect   = pygame.Rect(center_x - btn_w//2, HEIGHT//2 + 60, btn_w, btn_h)
+    backdrop = snapshot_backdrop(UI_OVERLAY_PAUSE)
     while True:
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_PAUSE)
-        screen.blit(overlay, (0, 0))
+        screen.blit(backdrop, (0, 0))
         draw_text_centered(FONT_LG, "Paused", HEIGHT//2 - 180, WHITE, y_is_center=True)
         draw_text_centered(FONT_MD, f"Wave {wave}  •  Score {score}", HEIGHT//2 - 125, (220, 220, 220), y_is_center=True)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         for rect, label in [(resume_rect, "Resume"), (save_rect, "Save"), (quit_rect, "Quit to Menu")]:
             draw_button(rect, label, hover=rect.collidepoint(mx, my), border_color=(100, 104, 112), text_color=UI_TEXT)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return "quit"
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -2638,9 +3356,10 @@ def reset_game():
         "Lucky": False, "Tough": False
     }
 
-    enemies.clear(); arrows.clear(); enemy_arrows.clear(); pending_orbs.clear()
+    clear_enemies(); clear_projectiles(); pending_orbs.clear()
     remote_arrows.clear()
     floating_texts.clear(); small_dots.clear(); lightning_lines.clear(); explosive_fx.clear()
+    damage_events.clear(); kill_events.clear()
     chat_messages.clear()
     flame_bomb_ball = None
     flame_bomb_zone = None
@@ -2650,7 +3369,7 @@ def reset_game():
     flame_mastery_unlocked = False
 
     wave = 1
-    enemies_per_wave = DEFAULTS["enemies_per_wave_start"]
+    enemies_per_wave = enemies_per_wave_start()
     score = 0
     weapon = "bow"
     robbers_gun = "ak47"
@@ -2679,7 +3398,7 @@ def reset_game():
     collection_start_ms = None
     collection_duration_ms = 5000
 
-    spawn_pattern_positions = generate_spawn_pattern(120)
+    spawn_pattern_positions = generate_spawn_pattern(SPAWN_PATTERN_SIZE)
     spawn_preview_ms = 2500  # faster start
     spawn_preview_active = False
     spawn_preview_start_ms = None
@@ -2713,75 +3432,143 @@ def reset_game():
     assassin_completed_bounties = set()
     assassin_active_bounties = []
     assassin_bounty_refresh_at_ms = 0
+    rebuild_hit_pipeline()
 
 # ---------- Spawning ----------
-def spawn_wave_at_positions(positions):
-    enemies.clear()
+ENEMY_TYPES = ("normal", "fast", "tank", "archer")
+ENEMIES_CAP = 70
+# Horde mode (--horde or "horde_mode" in settings): waves start larger, grow faster and are capped in
+# the thousands instead of at ENEMIES_CAP. The enemy grid and batched enemy drawing keep it playable.
+HORDE_MODE = "--horde" in sys.argv or settings.get("horde_mode", False)
+HORDE_ENEMIES_START = 60
+HORDE_ENEMIES_CAP = 3000
+HORDE_WAVE_GROWTH = 1.25
+SPAWN_PATTERN_SIZE = HORDE_ENEMIES_CAP * 5 // 4 if HORDE_MODE else 120  # room for Hard's 1.25x count
+
+def enemies_per_wave_start():
+    return HORDE_ENEMIES_START if HORDE_MODE else DEFAULTS["enemies_per_wave_start"]
+
+def wave_enemy_weights(w):
     # Enemy mix shifts by wave: later waves get more fast/archer/tank
-    w = wave if wave >= 1 else 1
+    w = w if w >= 1 else 1
     if w <= 5:
-        weights = [50, 30, 10, 10]
+        return [50, 30, 10, 10]
     elif w <= 15:
-        weights = [40, 35, 12, 13]
-    else:
-        weights = [30, 35, 18, 17]
-    for pos in positions:
-        etype = random.choices(["normal", "fast", "tank", "archer"], weights=weights)[0]
-        rect = pygame.Rect(pos[0] - 15, pos[1] - 15, 30, 30)
-        enemies.append(Enemy(rect, etype))
+        return [40, 35, 12, 13]
+    return [30, 35, 18, 17]
+
+def enemies_per_wave_after(new_wave, current):
+    """enemies_per_wave for new_wave, given the value used for the wave before it."""
+    # Refresh enemy count every boss wave; otherwise scale up (smoother cap)
+    if new_wave % 20 == 1:  # just finished a boss wave (wave 20, 40, ...)
+        return enemies_per_wave_start()
+    if HORDE_MODE:
+        return min(HORDE_ENEMIES_CAP, max(1, int(round(current * HORDE_WAVE_GROWTH))))
+    return min(ENEMIES_CAP, max(1, int(round(current * 1.07))))
+
+def wave_enemy_count(per_wave):
+    return max(1, int(round(per_wave * get_difficulty_count_mult())))
+
+def build_wave_enemies(w, positions):
+    """Enemies for wave w at positions, with all types drawn in one random.choices call."""
+    etypes = random.choices(ENEMY_TYPES, weights=wave_enemy_weights(w), k=len(positions))
+    return [Enemy(pygame.Rect(x - 15, y - 15, 30, 30), etype) for (x, y), etype in zip(positions, etypes)]
+
+def spawn_enemies(batch):
+    clear_enemies()
+    enemies.extend(batch)
+    now = pygame.time.get_ticks()
+    for e in batch:
+        if e.etype == "archer":
+            schedule_enemy(e, now, "shoot")
+
+def spawn_wave_at_positions(positions):
+    spawn_enemies(build_wave_enemies(wave, positions))
+
+# ---------- Wave templates ----------
+# The next wave's enemies are built on a background thread while the player collects orbs, so the
+# frame that spawns a large wave only hands a ready list over to `enemies`. A template matches one
+# (wave, count) and the spawn pattern it was built from; anything else is built inline as before.
+# Only the most recently requested template is kept: a slower, older build never overwrites it.
+_wave_template = None  # (wave, count, positions list, enemies, seq)
+_wave_template_pending = set()
+_wave_template_lock = threading.Lock()
+_wave_template_seq = 0  # bumped by each prepare_wave_template request
+
+def _template_matches(template, w, count, positions):
+    return template is not None and template[0] == w and template[1] == count and template[2] is positions
+
+def prepare_wave_template(w, count):
+    global _wave_template_seq
+    key = (w, count)
+    positions = spawn_pattern_positions
+    with _wave_template_lock:
+        if key in _wave_template_pending or _template_matches(_wave_template, w, count, positions):
+            return
+        _wave_template_pending.add(key)
+        _wave_template_seq += 1
+        seq = _wave_template_seq
+
+    def _run():
+        global _wave_template
+        batch = build_wave_enemies(w, positions[:count])
+        with _wave_template_lock:
+            _wave_template_pending.discard(key)
+            if _wave_template is None or _wave_template[4] < seq:
+                _wave_template = (w, count, positions, batch, seq)
+
+    threading.Thread(target=_run, daemon=True).start()
+
+def take_wave_template(w, count):
+    """The prepared enemies for wave w, or None if no matching template is ready."""
+    global _wave_template
+    with _wave_template_lock:
+        template, _wave_template = _wave_template, None
+    if _template_matches(template, w, count, spawn_pattern_positions):
+        return template[3]
+    return None
 
 def spawn_wave(count):
-    spawn_wave_at_positions(spawn_pattern_positions[:int(count)])
+    count = int(count)
+    batch = take_wave_template(wave, count)
+    if batch is None:
+        spawn_wave_at_positions(spawn_pattern_positions[:count])
+    else:
+        spawn_enemies(batch)
 
 def spawn_boss():
     # Larger, much tougher boss
     size = 140
     rect = pygame.Rect(WIDTH//2 - size//2, -size - 40, size, size)
-    boss = Enemy(rect, "tank", is_mini=False, hp_override=DEFAULTS["boss_hp"])
-    boss.is_boss = True
-    boss.max_hp = DEFAULTS["boss_hp"]
-    boss.color = (120, 0, 50)
-    boss.speed = 1.9
-    boss.damage = DEFAULTS["archer_shot_damage"] * 12
-    now = pygame.time.get_ticks()
-    boss.summon_timer = now + 3500
-    boss.summon_interval = 3500
-    boss.boss_shoot_timer = now + 3000
-    boss.boss_shoot_interval = 4200
-    boss.slam_timer = now + 4500
-    boss.slam_interval = 6200
-    boss.charge_timer = now + 5000
-    boss.charge_interval = 7500
-    boss.charge_until_ms = 0
-    boss.charge_speed = 11
+    boss = Boss(rect, pygame.time.get_ticks())
     enemies.append(boss)
+    schedule_enemy(boss, boss.summon_timer, "boss_summon")
+    schedule_enemy(boss, boss.boss_shoot_timer, "boss_shoot")
+    schedule_enemy(boss, boss.slam_timer, "boss_slam")
+    schedule_enemy(boss, boss.charge_timer, "boss_charge")
 
 def boss_try_shoot(boss_enemy):
     """Boss fires a heavy projectile at the player."""
     now = pygame.time.get_ticks()
-    interval = getattr(boss_enemy, "boss_shoot_interval", 3200)
-    if getattr(boss_enemy, "boss_shoot_timer", 0) and now >= boss_enemy.boss_shoot_timer:
+    if now >= boss_enemy.boss_shoot_timer:
         dx = player.centerx - boss_enemy.rect.centerx
         dy = player.centery - boss_enemy.rect.centery
         d = math.hypot(dx, dy) or 1
         speed = 7
         vx, vy = speed * dx / d, speed * dy / d
-        proj = pygame.Rect(boss_enemy.rect.centerx - 6, boss_enemy.rect.centery - 6, 12, 12)
-        dmg = getattr(boss_enemy, "damage", DEFAULTS["archer_shot_damage"] * 10)
-        enemy_arrows.append(EnemyArrow(proj, vx, vy, max(10, dmg // 4)))
-        boss_enemy.boss_shoot_timer = now + interval
+        acquire_enemy_arrow(boss_enemy.rect.centerx, boss_enemy.rect.centery, 12, vx, vy, max(10, boss_enemy.damage // 4))
+        boss_enemy.boss_shoot_timer = now + boss_enemy.boss_shoot_interval
 
 def boss_try_slam(boss_enemy, assassin_invis=False):
     """Boss slams ground; damages player if in range (not while Assassin invisible)."""
     now = pygame.time.get_ticks()
-    interval = getattr(boss_enemy, "slam_interval", 5000)
-    if getattr(boss_enemy, "slam_timer", 0) and now >= boss_enemy.slam_timer:
-        boss_enemy.slam_timer = now + interval
+    if now >= boss_enemy.slam_timer:
+        boss_enemy.slam_timer = now + boss_enemy.slam_interval
         dist = math.hypot(player.centerx - boss_enemy.rect.centerx, player.centery - boss_enemy.rect.centery)
         slam_range = 160
         if dist <= slam_range and not assassin_invis:
             global player_hp
-            dmg = max(8, getattr(boss_enemy, "damage", 40) // 3)
+            dmg = max(8, boss_enemy.damage // 3)
             if not admin_god_mode:
                 player_hp -= dmg
             floating_texts.append({"x": player.centerx, "y": player.centery - 30, "txt": "SLAM!", "color": ORANGE, "ttl": 1200, "vy": -0.8, "alpha": 255})
@@ -2790,36 +3577,225 @@ def boss_try_slam(boss_enemy, assassin_invis=False):
 def boss_try_charge(boss_enemy):
     """Boss starts a charge dash toward the player (handled in game loop for movement)."""
     now = pygame.time.get_ticks()
-    if getattr(boss_enemy, "charge_until_ms", 0) and now < boss_enemy.charge_until_ms:
+    if now < boss_enemy.charge_until_ms:
         return
-    interval = getattr(boss_enemy, "charge_interval", 6000)
-    if getattr(boss_enemy, "charge_timer", 0) and now >= boss_enemy.charge_timer:
-        boss_enemy.charge_timer = now + interval
+    if now >= boss_enemy.charge_timer:
+        boss_enemy.charge_timer = now + boss_enemy.charge_interval
         boss_enemy.charge_until_ms = now + 450
 
 def boss_update_charge(boss_enemy, now_ms):
     """Move boss during charge; return True if charging this frame."""
-    if not getattr(boss_enemy, "charge_until_ms", 0) or now_ms >= boss_enemy.charge_until_ms:
+    if now_ms >= boss_enemy.charge_until_ms:
         return False
     dx = player.centerx - boss_enemy.rect.centerx
     dy = player.centery - boss_enemy.rect.centery
     dist = math.hypot(dx, dy) or 1
-    spd = getattr(boss_enemy, "charge_speed", 14)
+    spd = boss_enemy.charge_speed
     boss_enemy.rect.x += int(spd * dx / dist)
     boss_enemy.rect.y += int(spd * dy / dist)
     return True
 
 def boss_try_summon(boss_enemy):
     now = pygame.time.get_ticks()
-    interval = getattr(boss_enemy, "summon_interval", 4000)
-    if getattr(boss_enemy, "summon_timer", 0) and now >= boss_enemy.summon_timer:
+    if now >= boss_enemy.summon_timer:
         n = random.randint(5, 8)
         for _ in range(n):
             rx = boss_enemy.rect.centerx + random.randint(-120, 120)
             ry = boss_enemy.rect.centery + random.randint(-120, 120)
             rect = pygame.Rect(rx, ry, 20, 20)
-            enemies.append(Enemy(rect, "fast", is_mini=True))
-        boss_enemy.summon_timer = now + interval
+            add_enemy(Enemy(rect, "fast", is_mini=True))
+        boss_enemy.summon_timer = now + boss_enemy.summon_interval
+
+# ---------- Enemy timers ----------
+# Burn/poison ticks, slow expiry, archer shots and boss attacks are due times in one heap instead of
+# checks every enemy makes every frame. Entries are never removed: a handler ignores an entry whose
+# enemy is gone (alive False) or whose deadline has since moved.
+_enemy_timers = []  # heap of (due_ms, seq, kind, enemy)
+_enemy_timer_seq = 0
+
+def schedule_enemy(enemy, due_ms, kind):
+    global _enemy_timer_seq
+    _enemy_timer_seq += 1
+    heapq.heappush(_enemy_timers, (due_ms, _enemy_timer_seq, kind, enemy))
+
+def add_enemy(enemy):
+    enemies.append(enemy)
+    if enemy.etype == "archer":
+        schedule_enemy(enemy, pygame.time.get_ticks(), "shoot")
+
+def clear_enemies():
+    global _enemy_grid_active
+    for e in enemies:
+        e.alive = False
+    enemies.clear()
+    _enemy_timers.clear()
+    _enemy_grid.clear()
+    _enemy_grid_active = False
+
+def nearest_enemies(x, y, k, exclude=None):
+    """Up to k live enemies closest to (x, y), nearest first (partial heap selection, no full sort)."""
+    key = lambda e: (e.rect.centerx - x) ** 2 + (e.rect.centery - y) ** 2
+    radius = ENEMY_GRID_CELL
+    while _enemy_grid_active and radius <= NEAREST_GRID_MAX_RADIUS:
+        # k hits inside the radius are the k nearest overall; otherwise widen, then fall back to the full scan
+        r2 = radius * radius
+        near = [e for e in enemies_near(x, y, radius) if e is not exclude and e.hp > 0 and key(e) <= r2]
+        if len(near) >= k:
+            return heapq.nsmallest(k, near, key=key)
+        radius *= 2
+    return heapq.nsmallest(k, (e for e in enemies if e is not exclude and e.hp > 0), key=key)
+
+# ---------- Enemy grid ----------
+# A uniform grid of enemy centers, rebuilt once per simulation step when there are at least
+# ENEMY_GRID_MIN enemies (horde waves). Arrow hits, splash-type effects and nearest-enemy lookups
+# then only look at nearby cells instead of every enemy. Below the threshold the queries return
+# `enemies` itself, so small waves behave exactly as before. Entries go stale within a step
+# (an enemy can die or be removed), so queries skip enemies that are no longer alive.
+ENEMY_GRID_CELL = 64
+ENEMY_GRID_MIN = 150
+NEAREST_GRID_MAX_RADIUS = 256
+_enemy_grid = {}  # (cx // ENEMY_GRID_CELL, cy // ENEMY_GRID_CELL) -> [enemy, ...]
+_enemy_grid_active = False
+_enemy_grid_reach = 0  # half the largest enemy size, so rect queries also find big enemies centered outside them
+
+def rebuild_enemy_grid():
+    global _enemy_grid_active, _enemy_grid_reach
+    _enemy_grid.clear()
+    _enemy_grid_active = len(enemies) >= ENEMY_GRID_MIN
+    if not _enemy_grid_active:
+        return
+    cell = ENEMY_GRID_CELL
+    grid = _enemy_grid
+    biggest = 0
+    for e in enemies:
+        r = e.rect
+        key = (r.centerx // cell, r.centery // cell)
+        bucket = grid.get(key)
+        if bucket is None:
+            grid[key] = [e]
+        else:
+            bucket.append(e)
+        if r.w > biggest:
+            biggest = r.w
+        if r.h > biggest:
+            biggest = r.h
+    _enemy_grid_reach = biggest // 2 + 1
+
+def _grid_cells(x0, y0, x1, y1):
+    cell = ENEMY_GRID_CELL
+    out = []
+    for gx in range(x0 // cell, x1 // cell + 1):
+        for gy in range(y0 // cell, y1 // cell + 1):
+            bucket = _enemy_grid.get((gx, gy))
+            if bucket:
+                out.extend([e for e in bucket if e.alive])
+    return out
+
+def enemies_near(x, y, radius):
+    """Enemies whose center may be within radius of (x, y); callers still check the exact distance."""
+    if not _enemy_grid_active:
+        return enemies
+    return _grid_cells(x - radius, y - radius, x + radius, y + radius)
+
+def enemies_near_rect(rect):
+    """Enemies whose rect may overlap rect."""
+    if not _enemy_grid_active:
+        return enemies
+    pad = _enemy_grid_reach
+    return _grid_cells(rect.left - pad, rect.top - pad, rect.right + pad, rect.bottom + pad)
+
+def _timer_status(enemy, due_ms, now_ms, assassin_invis):
+    if due_ms == enemy.next_status_ms:
+        enemy.status_tick(now_ms)
+
+def _timer_slow_end(enemy, due_ms, now_ms, assassin_invis):
+    if now_ms >= enemy.slow_until_ms:
+        enemy.slowed = False
+
+def _timer_shoot(enemy, due_ms, now_ms, assassin_invis):
+    if assassin_invis:
+        # re-check on the next run_enemy_timers pass, so the shot lands the first step it is allowed
+        schedule_enemy(enemy, now_ms, "shoot")
+        return
+    enemy.try_shoot(now_ms)
+    schedule_enemy(enemy, enemy.shoot_timer + enemy.shoot_interval, "shoot")
+
+def _timer_boss_summon(enemy, due_ms, now_ms, assassin_invis):
+    boss_try_summon(enemy)
+    schedule_enemy(enemy, enemy.summon_timer, "boss_summon")
+
+def _timer_boss_shoot(enemy, due_ms, now_ms, assassin_invis):
+    boss_try_shoot(enemy)
+    schedule_enemy(enemy, enemy.boss_shoot_timer, "boss_shoot")
+
+def _timer_boss_slam(enemy, due_ms, now_ms, assassin_invis):
+    boss_try_slam(enemy, assassin_invis)
+    schedule_enemy(enemy, enemy.slam_timer, "boss_slam")
+
+def _timer_boss_charge(enemy, due_ms, now_ms, assassin_invis):
+    boss_try_charge(enemy)
+    # Still mid-charge: the timer did not move, try again when the dash ends
+    due = enemy.charge_timer if enemy.charge_timer > now_ms else enemy.charge_until_ms
+    schedule_enemy(enemy, due, "boss_charge")
+
+ENEMY_TIMER_HANDLERS = {
+    "status": _timer_status,
+    "slow_end": _timer_slow_end,
+    "shoot": _timer_shoot,
+    "boss_summon": _timer_boss_summon,
+    "boss_shoot": _timer_boss_shoot,
+    "boss_slam": _timer_boss_slam,
+    "boss_charge": _timer_boss_charge,
+}
+
+def run_enemy_timers(now_ms, assassin_invis=False):
+    """Fire every timer due by now_ms. Timers scheduled by a handler wait for the next frame."""
+    due = []
+    while _enemy_timers and _enemy_timers[0][0] <= now_ms:
+        due.append(heapq.heappop(_enemy_timers))
+    for due_ms, _, kind, enemy in due:
+        if enemy.alive:
+            ENEMY_TIMER_HANDLERS[kind](enemy, due_ms, now_ms, assassin_invis)
+
+# ---------- Retained HUD ----------
+# Each HUD widget keeps the text it last rendered and only calls font.render again when that
+# text (or its font/colour) changes, e.g. once per second for a cooldown counter.
+class HudLabel:
+    __slots__ = ("key", "surf")
+
+    def __init__(self):
+        self.key = None
+        self.surf = None
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        if key != self.key:
+            self.key = key
+            self.surf = font.render(text, True, color)
+        return self.surf
+
+hud_daily_label = HudLabel()
+hud_ability_label = HudLabel()
+hud_status_label = HudLabel()
+hud_shotgun_label = HudLabel()
+hud_admin_label = HudLabel()
+hud_exp_label = HudLabel()
+hud_boss_label = HudLabel()
+hud_boss_hp_label = HudLabel()
+_hud_panel_text = None
+_hud_panel_surf = None
+
+def hud_panel_surface(text, max_w):
+    """Stats panel (translucent background, border and text) composited once per text change."""
+    global _hud_panel_text, _hud_panel_surf
+    if text != _hud_panel_text or _hud_panel_surf is None:
+        txt = FONT_SM.render(text, True, BLACK)
+        panel = pygame.Surface((min(txt.get_width() + 16, max_w), txt.get_height() + 8), pygame.SRCALPHA)
+        panel.fill((255, 255, 255, 200))
+        pygame.draw.rect(panel, UI_BORDER_LIGHT, panel.get_rect(), 2)
+        panel.blit(txt, (8, 4))
+        _hud_panel_text, _hud_panel_surf = text, panel
+    return _hud_panel_surf
 
 def draw_boss_bar(boss):
     """Draw a boss HP bar at top center when a boss is alive."""
@@ -2827,21 +3803,20 @@ def draw_boss_bar(boss):
     bar_h = 28
     x = WIDTH//2 - bar_w//2
     y = 10
-    max_hp = getattr(boss, "max_hp", DEFAULTS["boss_hp"])
-    frac = (boss.hp / max_hp) if max_hp > 0 else 0
+    frac = (boss.hp / boss.max_hp) if boss.max_hp > 0 else 0
     frac = max(0, min(1, frac))
     pygame.draw.rect(screen, DARK_GRAY, (x, y, bar_w, bar_h))
     pygame.draw.rect(screen, (80, 0, 40), (x, y, int(bar_w * frac), bar_h))
     pygame.draw.rect(screen, (180, 20, 80), (x, y, bar_w, bar_h), 4)
-    label = FONT_SM.render("BOSS", True, WHITE)
+    label = hud_boss_label.render(FONT_SM, "BOSS", WHITE)
     screen.blit(label, (x + 8, y + (bar_h - label.get_height())//2))
-    hp_txt = FONT_SM.render(f"{int(boss.hp)} / {int(max_hp)}", True, WHITE)
+    hp_txt = hud_boss_hp_label.render(FONT_SM, f"{int(boss.hp)} / {int(boss.max_hp)}", WHITE)
     screen.blit(hp_txt, (x + bar_w - hp_txt.get_width() - 8, y + (bar_h - hp_txt.get_height())//2))
 
 # ---------- FX / Orbs / UI ----------
 def spawn_orb(x,y,amount=1):
     for _ in range(int(amount)):
-        pending_orbs.append({"x": float(x+random.randint(-10,10)), "y": float(y+random.randint(-10,10)), "amount": 1})
+        pending_orbs.add(x+random.randint(-10,10), y+random.randint(-10,10))
 
 def draw_hp_bar(hp):
     w, h = 300, 28
@@ -2864,7 +3839,7 @@ def draw_exp_bar():
     frac = min(1.0, player_exp / exp_required) if exp_required > 0 else 0.0
     pygame.draw.rect(screen, BLUE, (x, y, int(w * frac), h))
     pygame.draw.rect(screen, UI_BORDER, (x, y, w, h), 3)
-    lvl_txt = FONT_SM.render(f"Level: {player_level}  EXP: {player_exp}/{exp_required}", True, UI_TEXT)
+    lvl_txt = hud_exp_label.render(FONT_SM, f"Level: {player_level}  EXP: {player_exp}/{exp_required}", UI_TEXT)
     screen.blit(lvl_txt, (x + 6, y - 22))
 
 def notify_once(msg, duration=900):
@@ -2878,13 +3853,29 @@ def notify_once(msg, duration=900):
         pygame.draw.rect(screen, UI_PANEL_BG, pr)
         pygame.draw.rect(screen, UI_BORDER_LIGHT, pr, 3)
         draw_text_centered(FONT_LG, msg, HEIGHT//2 - 20, UI_TEXT, y_is_center=True)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 save_game(); pygame.quit(); sys.exit()
         clock.tick(FPS)
 
 # ---------- Ability choice between waves (repeat allowed) ----------
+# Ability cards: wrapped and rendered lines per card text, reused across frames and level-ups
+_ability_card_cache = {}
+
+def ability_card_layout(display, desc_short, max_text_width):
+    """Return (title_surfs, title_line_h, desc_surfs, desc_line_h) for one ability card."""
+    key = (display, desc_short, max_text_width)
+    layout = _ability_card_cache.get(key)
+    if layout is None:
+        title_font = FONT_MD if FONT_MD.size(display)[0] <= max_text_width else FONT_SM
+        title_lines = wrap_text_to_width(title_font, display, max_text_width) or [display]
+        desc_lines = wrap_text_to_width(FONT_SM, desc_short, max_text_width) if desc_short else []
+        layout = ([title_font.render(line, True, BLACK) for line in title_lines], title_font.size("Ay")[1],
+                  [FONT_SM.render(line, True, DARK_GRAY) for line in desc_lines], FONT_SM.size("Ay")[1])
+        _ability_card_cache[key] = layout
+    return layout
+
 def ability_choice_between_waves():
     global player_hp, arrow_damage, knockback_level, pierce_level, corrosive_level, max_hp
 
@@ -2983,19 +3974,18 @@ def ability_choice_between_waves():
     padding_bottom = 14
     max_text_width = box_width - padding_x * 2
 
-    def get_button_height(label):
+    def card_layout(label):
         display = ability_display_name(label)
         desc = ability_description(label)
         desc_short = (desc[:56] + ("…" if len(desc) > 56 else "")) if desc else ""
-        title_font = FONT_MD if FONT_MD.render(display, True, BLACK).get_width() <= max_text_width else FONT_SM
-        title_lines = wrap_text_to_width(title_font, display, max_text_width)
-        if not title_lines:
-            title_lines = [display]
-        line_height = title_font.render("Ay", True, BLACK).get_height()
-        title_height = len(title_lines) * line_height
-        desc_lines = wrap_text_to_width(FONT_SM, desc_short, max_text_width) if desc_short else []
-        desc_line_h = FONT_SM.render("Ay", True, BLACK).get_height()
-        desc_height = len(desc_lines) * desc_line_h if desc_lines else 0
+        return ability_card_layout(display, desc_short, max_text_width)
+
+    layouts = {c: card_layout(c) for c in choices}
+
+    def get_button_height(label):
+        title_surfs, line_height, desc_surfs, desc_line_h = layouts[label]
+        title_height = len(title_surfs) * line_height
+        desc_height = len(desc_surfs) * desc_line_h
         return padding_top + title_height + (gap + desc_height if desc_height else 0) + padding_bottom
 
     need_h = max(get_button_height(c) for c in choices)
@@ -3009,36 +3999,24 @@ def ability_choice_between_waves():
     while True:
         screen.fill(bg_color)
         draw_text_centered(FONT_LG, f"Choose an Upgrade ({chosen_rarity})", HEIGHT//2 - 160, RARITY_COLORS.get(chosen_rarity, BLUE), y_is_center=True)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         for rect, label in buttons:
-            display = ability_display_name(label)
-            desc = ability_description(label)
-            desc_short = (desc[:56] + ("…" if len(desc) > 56 else "")) if desc else ""
+            title_surfs, line_height, desc_surfs, desc_line_h = layouts[label]
             rarity = ABILITY_RARITY.get(label, "Common")
             pygame.draw.rect(screen, LIGHT_GRAY, rect)
             pygame.draw.rect(screen, RARITY_COLORS.get(rarity, BLACK), rect, 5)
 
-            title_font = FONT_MD if FONT_MD.render(display, True, BLACK).get_width() <= max_text_width else FONT_SM
-            title_lines = wrap_text_to_width(title_font, display, max_text_width)
-            if not title_lines:
-                title_lines = [display]
-            line_height = title_font.render("Ay", True, BLACK).get_height()
             y = rect.y + padding_top
-            for line in title_lines:
-                txt = title_font.render(line, True, BLACK)
+            for txt in title_surfs:
                 screen.blit(txt, (rect.x + padding_x, y))
                 y += line_height
             y += gap
-            if desc_short:
-                desc_lines = wrap_text_to_width(FONT_SM, desc_short, max_text_width)
-                desc_line_h = FONT_SM.render("Ay", True, BLACK).get_height()
-                for line in desc_lines:
-                    desc_txt = FONT_SM.render(line, True, DARK_GRAY)
-                    screen.blit(desc_txt, (rect.x + padding_x, y))
-                    y += desc_line_h
-        pygame.display.flip()
-
-        for ev in pygame.event.get():
+            for desc_txt in desc_surfs:
+                screen.blit(desc_txt, (rect.x + padding_x, y))
+                y += desc_line_h
+        present()
+
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 save_game(); pygame.quit(); sys.exit()
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -3105,6 +4083,101 @@ def ability_choice_between_waves():
                             owned_abilities["Execution"] = True
                         return
 
+# ---------- Shape cache ----------
+# Translucent shapes the game loop draws every frame are built once and then just blitted.
+# The cache is emptied when it grows past SHAPE_CACHE_MAX. Flamethrower cones are bucketed by aim
+# angle and kept in their own least-recently-used cache (a full circle of cones is ~80 MB), so
+# sweeping the cone around never evicts the corrosive field.
+_shape_cache = {}
+SHAPE_CACHE_MAX = 64
+_cone_cache = {}  # angle bucket -> (surface, (dx, dy)), least recently used first
+CONE_ANGLE_BUCKETS = 180  # 2 degrees per bucket
+CONE_CACHE_MAX = 90  # half a circle of aim
+
+def _cached_shape(key, build):
+    surf = _shape_cache.get(key)
+    if surf is None:
+        if len(_shape_cache) >= SHAPE_CACHE_MAX:
+            _shape_cache.clear()
+        surf = _shape_cache[key] = build()
+    return surf
+
+def corrosive_field_surface(size, alpha):
+    def build():
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        surf.fill((*ACID_YELLOW, alpha))
+        return surf
+    return _cached_shape(("corrosive", size, alpha), build)
+
+def spawn_marker_surface(size):
+    """Red translucent box with an X, as shown at each upcoming spawn point."""
+    def build():
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        surf.fill((200, 40, 40, 120))
+        rect = surf.get_rect()
+        pygame.draw.rect(surf, RED, rect, 3)
+        pygame.draw.line(surf, RED, (rect.left+6, rect.top+6), (rect.right-6, rect.bottom-6), 3)
+        pygame.draw.line(surf, RED, (rect.right-6, rect.top+6), (rect.left+6, rect.bottom-6), 3)
+        return surf
+    return _cached_shape(("spawn", size), build)
+
+def flame_cone_surface(ang):
+    """Flamethrower cone pointing along ang. Returns (surface, (dx, dy)) where dx, dy is the blit
+    offset from the cone apex."""
+    bucket = int(round(ang / (2 * math.pi) * CONE_ANGLE_BUCKETS)) % CONE_ANGLE_BUCKETS
+    cone = _cone_cache.pop(bucket, None)
+    if cone is not None:
+        _cone_cache[bucket] = cone  # move to the most recently used end
+    else:
+        if len(_cone_cache) >= CONE_CACHE_MAX:
+            del _cone_cache[next(iter(_cone_cache))]
+        a = bucket * 2 * math.pi / CONE_ANGLE_BUCKETS
+        half = FLAME_THROWER_CONE_ANGLE_RAD / 2
+        r = FLAME_THROWER_CONE_RANGE
+        outer = [(0.0, 0.0), (r * math.cos(a - half), r * math.sin(a - half)), (r * math.cos(a + half), r * math.sin(a + half))]
+        inner = [(0.0, 0.0), (0.7*r*math.cos(a - half), 0.7*r*math.sin(a - half)), (0.7*r*math.cos(a + half), 0.7*r*math.sin(a + half))]
+        left = int(math.floor(min(x for x, _ in outer))) - 1
+        top = int(math.floor(min(y for _, y in outer))) - 1
+        w = int(math.ceil(max(x for x, _ in outer))) - left + 2
+        h = int(math.ceil(max(y for _, y in outer))) - top + 2
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.polygon(surf, (255, 140, 0, 140), [(x - left, y - top) for x, y in outer])
+        pygame.draw.polygon(surf, (255, 200, 50, 90), [(x - left, y - top) for x, y in inner])
+        cone = _cone_cache[bucket] = (surf, (left, top))
+    return cone
+
+# ---------- Enemy atlas ----------
+# Enemies are plain filled rects, so every (color, size) they can have is packed once into one
+# atlas surface and the whole enemy list is drawn with a single screen.blits call. New sizes
+# (the boss, minis) are appended to the right; the atlas only grows, so this happens a few times per run.
+class EnemyAtlas:
+    def __init__(self):
+        self.surface = pygame.Surface((1, 1))
+        self.areas = {}  # (color, w, h) -> Rect in surface
+        self._x = 0
+
+    def _add(self, key):
+        color, w, h = key
+        old = self.surface
+        surf = pygame.Surface((self._x + w, max(old.get_height(), h)))
+        surf.blit(old, (0, 0))
+        surf.fill(color, (self._x, 0, w, h))
+        self.areas[key] = pygame.Rect(self._x, 0, w, h)
+        self._x += w
+        self.surface = surf
+
+    def blit_list(self, enemies_list):
+        """(atlas, dest rect, area) sequence for screen.blits."""
+        areas = self.areas
+        keys = [(e.color, e.rect.w, e.rect.h) for e in enemies_list]
+        for key in keys:
+            if key not in areas:
+                self._add(key)
+        surf = self.surface
+        return [(surf, e.rect, areas[key]) for e, key in zip(enemies_list, keys)]
+
+enemy_atlas = EnemyAtlas()
+
 # ---------- Combat ----------
 CORROSIVE_BASE_RADIUS = 360
 CORROSIVE_DPS = 12.5
@@ -3115,168 +4188,269 @@ def draw_corrosive_field_visual(actual_radius, alpha=80, outline=True):
     cx, cy = player.centerx, player.centery
     left = cx - actual_radius
     top = cy - actual_radius
-    surf = pygame.Surface((size, size), pygame.SRCALPHA)
-    surf.fill((*ACID_YELLOW, alpha))
-    screen.blit(surf, (left, top))
+    screen.blit(corrosive_field_surface(size, alpha), (left, top))
     if outline:
         pygame.draw.rect(screen, ACID_YELLOW, (left, top, size, size), 3)
 
-def handle_arrow_hit(enemy, dmg=None):
-    global first_arrow_hit_this_wave, berserk_until_ms, player_hp
-    dmg = dmg if dmg is not None else arrow_damage
-    now = pygame.time.get_ticks()
+# ---------- Damage resolution ----------
+# Hits and AoE lower hp immediately (so thresholds like Execution see current hp), but their floating
+# text and the resulting kills are batched: resolve_damage() emits the text and drops every dead enemy
+# in a single sweep instead of an enemies.remove() per kill. In horde mode, damage numbers that would
+# take the live floating texts past DAMAGE_TEXT_MAX are not shown (the newest of a batch are kept).
+damage_events = []  # (x, y, txt, color, ttl, vy)
+_damage_kill_pending = False
+DAMAGE_TEXT_MAX = 300
+
+def deal_damage(enemy, amount, color=RED, ttl=1000, vy=-0.6, txt=None, mastery_credit=True):
+    """mastery_credit=False: a kill by this hit does not count toward Flame mastery (Corrosive, Lab splash)."""
+    global _damage_kill_pending
+    killing_blow = enemy.hp > 0
+    enemy.hp -= amount
+    if enemy.hp <= 0:
+        _damage_kill_pending = True
+        if killing_blow:
+            enemy._mastery_credit = mastery_credit
+    damage_events.append((enemy.rect.centerx, enemy.rect.top - 12, txt if txt is not None else f"-{amount}", color, ttl, vy))
+
+def resolve_damage():
+    """Flush queued damage text and remove enemies killed since the last call."""
+    global _damage_kill_pending
+    if damage_events:
+        room = DAMAGE_TEXT_MAX - len(floating_texts) if HORDE_MODE else len(damage_events)
+        if room > 0:
+            floating_texts.extend({"x": x, "y": y, "txt": txt, "color": color, "ttl": ttl, "vy": vy, "alpha": 255}
+                                  for x, y, txt, color, ttl, vy in damage_events[-room:])
+        damage_events.clear()
+    if not _damage_kill_pending:
+        return
+    _damage_kill_pending = False
+    dead = [e for e in enemies if e.hp <= 0]
+    if not dead:
+        return
+    enemies[:] = [e for e in enemies if e.hp > 0]
+    for e in dead:
+        e.alive = False
+        emit_kill(e, mastery_credit=e._mastery_credit)
+
+# ---------- Kill events ----------
+# Every enemy death is queued with emit_kill(); drain_kill_events() runs once per frame and hands the
+# whole batch to each listener in KILL_LISTENERS. New kill bookkeeping is one more listener.
+kill_events = []  # (enemy, x, y, dot_final_blow, mastery_credit)
+
+def emit_kill(enemy, dot_final_blow=False, mastery_credit=True):
+    kill_events.append((enemy, enemy.rect.centerx, enemy.rect.centery, dot_final_blow, mastery_credit))
+
+def _on_kills_flame_mastery(batch):
+    if flame_mastery_unlocked:
+        return
+    for enemy, _x, _y, dot_final_blow, mastery_credit in batch:
+        if mastery_credit:
+            record_flame_mastery_progress(enemy, dot_final_blow=dot_final_blow)
+
+def _on_kills_assassin(batch):
+    if not isinstance(player_class, Assassin):
+        return
+    for enemy, _x, _y, _dot, _credit in batch:
+        record_assassin_kill(enemy)
+
+def _on_kills_orbs(batch):
+    for _enemy, x, y, _dot, _credit in batch:
+        spawn_orb(x, y, amount=1)
+
+def _on_kills_score(batch):
+    global score
+    score += len(batch)
+
+KILL_LISTENERS = [_on_kills_flame_mastery, _on_kills_assassin, _on_kills_orbs, _on_kills_score]
+
+def drain_kill_events():
+    """Run this frame's kills through every listener, one batch each."""
+    if not kill_events:
+        return
+    batch = kill_events[:]
+    kill_events.clear()
+    for listener in KILL_LISTENERS:
+        listener(batch)
+
+# ---------- On-hit pipeline ----------
+# handle_arrow_hit only runs what the player owns: rebuild_hit_pipeline() compiles the owned abilities
+# and class into ordered lists. Call it whenever owned_abilities or player_class change.
+_hit_damage_mods = []  # fn(enemy, dmg, now) -> dmg, applied in order before damage lands
+_hit_effects = []      # fn(enemy, dmg, now, executed), run in order after damage lands
+_hit_execution = False
+_hit_berserk = False
+
+def _hit_mod_flame_zone(enemy, dmg, now):
     # Flame Bomb zone (Flame Archer mastery): 1.5x damage while inside
-    if flame_bomb_zone and isinstance(player_class, FlameArcher):
-        if math.hypot(player.centerx - flame_bomb_zone["cx"], player.centery - flame_bomb_zone["cy"]) <= flame_bomb_zone["radius"]:
-            dmg = int(dmg * 1.5)
+    if flame_bomb_zone and math.hypot(player.centerx - flame_bomb_zone["cx"], player.centery - flame_bomb_zone["cy"]) <= flame_bomb_zone["radius"]:
+        return int(dmg * 1.5)
+    return dmg
+
+def _hit_mod_berserk(enemy, dmg, now):
     # Berserk (Legendary): consume stack for +35% damage on next shot
-    if owned_abilities.get("Berserk", False) and berserk_until_ms and now < berserk_until_ms:
-        dmg = int(dmg * 1.35)
+    global berserk_until_ms
+    if berserk_until_ms and now < berserk_until_ms:
         berserk_until_ms = 0
+        return int(dmg * 1.35)
+    return dmg
+
+def _hit_mod_overdraw(enemy, dmg, now):
     # Overdraw (Epic): first arrow hit each wave +50% damage
-    if owned_abilities.get("Overdraw", False) and not first_arrow_hit_this_wave:
-        dmg = int(dmg * 1.5)
+    global first_arrow_hit_this_wave
+    if not first_arrow_hit_this_wave:
         first_arrow_hit_this_wave = True
+        return int(dmg * 1.5)
+    return dmg
+
+def _hit_mod_heartseeker(enemy, dmg, now):
     # Heartseeker (Legendary): +15% damage to enemies above 70% HP
-    enemy_max = getattr(enemy, "max_hp", enemy.hp)
-    if owned_abilities.get("Heartseeker", False) and enemy_max > 0 and enemy.hp / enemy_max > 0.70:
-        dmg = int(dmg * 1.15)
+    enemy_max = enemy.max_hp
+    if enemy_max > 0 and enemy.hp / enemy_max > 0.70:
+        return int(dmg * 1.15)
+    return dmg
+
+def _hit_mod_lucky(enemy, dmg, now):
     # Lucky (Common): 10% chance for 1.5x damage
-    if owned_abilities.get("Lucky", False) and random.random() < 0.10:
-        dmg = int(dmg * 1.5)
+    return int(dmg * 1.5) if random.random() < 0.10 else dmg
+
+def _hit_mod_critical(enemy, dmg, now):
     # Critical (Epic): 20% chance for 2x damage
-    if owned_abilities.get("Critical", False) and random.random() < 0.20:
-        dmg = int(dmg * 2)
-    # Execution (Mythical): enemies below 45% max HP die instantly
-    executed = False
-    if owned_abilities.get("Execution", False) and enemy.hp <= 0.45 * enemy_max and enemy_max > 0:
-        enemy.hp = 0
-        executed = True
-    else:
-        enemy.hp -= dmg
-    play_sound("hit")
-    if executed:
-        floating_texts.append({"x":enemy.rect.centerx,"y":enemy.rect.top-12,"txt":"EXECUTE!","color":PURPLE,"ttl":1200,"vy":-0.6,"alpha":255})
-    else:
-        floating_texts.append({"x":enemy.rect.centerx,"y":enemy.rect.top-12,"txt":f"-{int(dmg)}","color":RED,"ttl":1000,"vy":-0.6,"alpha":255})
+    return int(dmg * 2) if random.random() < 0.20 else dmg
 
+def _hit_fx_vampiric(enemy, dmg, now, executed):
     # Vampiric (Legendary): heal 8% of arrow damage
-    if owned_abilities.get("Vampiric", False) and not executed and dmg > 0:
+    global player_hp
+    if not executed and dmg > 0:
         heal = max(1, int(dmg * 0.08))
         player_hp = min(max_hp, player_hp + heal)
         floating_texts.append({"x": player.centerx, "y": player.centery - 20, "txt": f"+{heal}", "color": GREEN, "ttl": 700, "vy": -0.5, "alpha": 255})
 
+def _hit_fx_class(enemy, dmg, now, executed):
     try:
         player_class.on_arrow_hit(enemy, dmg)
     except:
         pass
 
-    if owned_abilities.get("Flame", False):
-        enemy.burn_ms_left = 6000 if flame_mastery_unlocked else 3000
-        enemy.last_status_tick = 0  # next apply_status will tick and show -5
-    if owned_abilities.get("Poison", False):
-        enemy.poison_ms_left = 3000
-        enemy.last_status_tick = 0
-    if owned_abilities.get("Frost", False):
-        enemy.slow_until_ms = now + 2000
-    if owned_abilities.get("Haste", False) and random.random() < 0.12:
-        enemy.slow_until_ms = now + 1000
+def _hit_fx_flame(enemy, dmg, now, executed):
+    enemy.burn_ms_left = 6000 if flame_mastery_unlocked else 3000
+    enemy.restart_status_tick(now)  # ticks and shows -5 next frame
 
-    # Lightning ability: chain to up to 2 nearby enemies (same as Lightning Archer class)
-    if owned_abilities.get("Lightning", False):
-        ox, oy = enemy.rect.centerx, enemy.rect.centery
-        lightning_lines.append({"x1": ox, "y1": oy, "x2": ox, "y2": oy, "ttl": 200})
-        others = [e for e in enemies if e is not enemy and getattr(e, "hp", 0) > 0]
-        others.sort(key=lambda e: math.hypot(e.rect.centerx - ox, e.rect.centery - oy))
-        hit = 0
-        for e in others:
-            if hit >= 2:
-                break
-            dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
-            if dist <= 120:
-                dmg2 = max(1, int(dmg * 0.5))
-                e.hp -= dmg2
-                floating_texts.append({"x": e.rect.centerx, "y": e.rect.top - 12, "txt": f"-{dmg2}", "color": YELLOW, "ttl": 1000, "vy": -0.6, "alpha": 255})
-                lightning_lines.append({"x1": ox, "y1": oy, "x2": e.rect.centerx, "y2": e.rect.centery, "ttl": 260})
-                hit += 1
-                if e.hp <= 0:
-                    record_flame_mastery_progress(e, dot_final_blow=False)
-                    record_assassin_kill(e)
-                    spawn_orb(e.rect.centerx, e.rect.centery, amount=1)
-                    globals()["score"] += 1
-                    try: enemies.remove(e)
-                    except: pass
+def _hit_fx_poison(enemy, dmg, now, executed):
+    enemy.poison_ms_left = 3000
+    enemy.restart_status_tick(now)
+
+def _hit_fx_frost(enemy, dmg, now, executed):
+    enemy.slow(now + 2000)
 
+def _hit_fx_haste(enemy, dmg, now, executed):
+    if random.random() < 0.12:
+        enemy.slow(now + 1000)
+
+def _hit_fx_lightning(enemy, dmg, now, executed):
+    # Lightning ability: chain to up to 2 nearby enemies (same as Lightning Archer class)
+    ox, oy = enemy.rect.centerx, enemy.rect.centery
+    lightning_lines.append({"x1": ox, "y1": oy, "x2": ox, "y2": oy, "ttl": 200})
+    for e in nearest_enemies(ox, oy, 2, exclude=enemy):
+        dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
+        if dist <= 120:
+            dmg2 = max(1, int(dmg * 0.5))
+            deal_damage(e, dmg2, YELLOW)
+            lightning_lines.append({"x1": ox, "y1": oy, "x2": e.rect.centerx, "y2": e.rect.centery, "ttl": 260})
+
+def _hit_fx_splash(enemy, dmg, now, executed):
     # Splash (Epic): 30% damage to enemies within 50px
-    if owned_abilities.get("Splash", False) and dmg > 0:
-        splash_dmg = max(1, int(dmg * 0.30))
-        ox, oy = enemy.rect.centerx, enemy.rect.centery
-        for e in enemies[:]:
-            if e is enemy or getattr(e, "hp", 0) <= 0:
-                continue
-            dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
-            if dist <= 50 and dist > 0:
-                e.hp -= splash_dmg
-                floating_texts.append({"x": e.rect.centerx, "y": e.rect.top - 12, "txt": f"-{splash_dmg}", "color": (200, 200, 255), "ttl": 900, "vy": -0.6, "alpha": 255})
-                if e.hp <= 0:
-                    record_flame_mastery_progress(e, dot_final_blow=False)
-                    record_assassin_kill(e)
-                    spawn_orb(e.rect.centerx, e.rect.centery, amount=1)
-                    globals()["score"] += 1
-                    try: enemies.remove(e)
-                    except: pass
+    if dmg <= 0:
+        return
+    splash_dmg = max(1, int(dmg * 0.30))
+    ox, oy = enemy.rect.centerx, enemy.rect.centery
+    for e in enemies_near(ox, oy, 50):
+        if e is enemy or e.hp <= 0:
+            continue
+        dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
+        if dist <= 50 and dist > 0:
+            deal_damage(e, splash_dmg, (200, 200, 255), ttl=900)
 
+def _hit_fx_explosive(enemy, dmg, now, executed):
     # Explosive (Legendary): 25% damage to enemies within 65px
-    if owned_abilities.get("Explosive", False) and dmg > 0:
-        exp_dmg = max(1, int(dmg * 0.25))
-        ox, oy = enemy.rect.centerx, enemy.rect.centery
-        explosive_fx.append({"cx": ox, "cy": oy, "ttl": 500, "start_ttl": 500})
-        for e in enemies[:]:
-            if e is enemy or getattr(e, "hp", 0) <= 0:
-                continue
-            dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
-            if dist <= 65 and dist > 0:
-                e.hp -= exp_dmg
-                floating_texts.append({"x": e.rect.centerx, "y": e.rect.top - 12, "txt": f"-{exp_dmg}", "color": (255, 180, 80), "ttl": 900, "vy": -0.6, "alpha": 255})
-                if e.hp <= 0:
-                    record_flame_mastery_progress(e, dot_final_blow=False)
-                    record_assassin_kill(e)
-                    spawn_orb(e.rect.centerx, e.rect.centery, amount=1)
-                    globals()["score"] += 1
-                    try: enemies.remove(e)
-                    except: pass
+    if dmg <= 0:
+        return
+    exp_dmg = max(1, int(dmg * 0.25))
+    ox, oy = enemy.rect.centerx, enemy.rect.centery
+    explosive_fx.append({"cx": ox, "cy": oy, "ttl": 500, "start_ttl": 500})
+    for e in enemies_near(ox, oy, 65):
+        if e is enemy or e.hp <= 0:
+            continue
+        dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
+        if dist <= 65 and dist > 0:
+            deal_damage(e, exp_dmg, (255, 180, 80), ttl=900)
 
+def _hit_fx_shatter(enemy, dmg, now, executed):
     # Shatter (Legendary): 35% damage to enemies within 40px
-    if owned_abilities.get("Shatter", False) and dmg > 0:
-        shat_dmg = max(1, int(dmg * 0.35))
-        ox, oy = enemy.rect.centerx, enemy.rect.centery
-        for e in enemies[:]:
-            if e is enemy or getattr(e, "hp", 0) <= 0:
-                continue
-            dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
-            if dist <= 40 and dist > 0:
-                e.hp -= shat_dmg
-                floating_texts.append({"x": e.rect.centerx, "y": e.rect.top - 12, "txt": f"-{shat_dmg}", "color": (200, 100, 150), "ttl": 900, "vy": -0.6, "alpha": 255})
-                if e.hp <= 0:
-                    record_flame_mastery_progress(e, dot_final_blow=False)
-                    record_assassin_kill(e)
-                    spawn_orb(e.rect.centerx, e.rect.centery, amount=1)
-                    globals()["score"] += 1
-                    try: enemies.remove(e)
-                    except: pass
+    if dmg <= 0:
+        return
+    shat_dmg = max(1, int(dmg * 0.35))
+    ox, oy = enemy.rect.centerx, enemy.rect.centery
+    for e in enemies_near(ox, oy, 40):
+        if e is enemy or e.hp <= 0:
+            continue
+        dist = math.hypot(e.rect.centerx - ox, e.rect.centery - oy)
+        if dist <= 40 and dist > 0:
+            deal_damage(e, shat_dmg, (200, 100, 150), ttl=900)
+
+# Order matters: it is the order the old if-chain ran in (damage multipliers stack multiplicatively with int() between).
+_HIT_DAMAGE_MOD_ORDER = [
+    ("Berserk", _hit_mod_berserk), ("Overdraw", _hit_mod_overdraw), ("Heartseeker", _hit_mod_heartseeker),
+    ("Lucky", _hit_mod_lucky), ("Critical", _hit_mod_critical),
+]
+_HIT_EFFECT_ORDER = [
+    ("Flame", _hit_fx_flame), ("Poison", _hit_fx_poison), ("Frost", _hit_fx_frost), ("Haste", _hit_fx_haste),
+    ("Lightning", _hit_fx_lightning), ("Splash", _hit_fx_splash), ("Explosive", _hit_fx_explosive), ("Shatter", _hit_fx_shatter),
+]
 
-    if enemy.hp <= 0:
-        if owned_abilities.get("Berserk", False):
-            globals()["berserk_until_ms"] = now + 2500
-        record_flame_mastery_progress(enemy, dot_final_blow=False)
-        record_assassin_kill(enemy)
-        spawn_orb(enemy.rect.centerx, enemy.rect.centery, amount=1)
-        globals()["score"] += 1
-        try: enemies.remove(enemy)
-        except: pass
+def rebuild_hit_pipeline():
+    """Compile owned abilities + class into the on-hit lists used by handle_arrow_hit."""
+    global _hit_damage_mods, _hit_effects, _hit_execution, _hit_berserk
+    mods = []
+    if isinstance(player_class, FlameArcher):
+        mods.append(_hit_mod_flame_zone)
+    mods += [fn for name, fn in _HIT_DAMAGE_MOD_ORDER if owned_abilities.get(name, False)]
+    effects = []
+    if owned_abilities.get("Vampiric", False):
+        effects.append(_hit_fx_vampiric)
+    if type(player_class).on_arrow_hit is not PlayerClass.on_arrow_hit:
+        effects.append(_hit_fx_class)
+    effects += [fn for name, fn in _HIT_EFFECT_ORDER if owned_abilities.get(name, False)]
+    _hit_damage_mods = mods
+    _hit_effects = effects
+    _hit_execution = owned_abilities.get("Execution", False)
+    _hit_berserk = owned_abilities.get("Berserk", False)
+
+def handle_arrow_hit(enemy, dmg=None):
+    dmg = dmg if dmg is not None else arrow_damage
+    now = pygame.time.get_ticks()
+    for mod in _hit_damage_mods:
+        dmg = mod(enemy, dmg, now)
+    # Execution (Mythical): enemies below 45% max HP die instantly
+    executed = False
+    if _hit_execution:
+        enemy_max = enemy.max_hp
+        if enemy.hp <= 0.45 * enemy_max and enemy_max > 0:
+            executed = True
+    play_sound("hit")
+    if executed:
+        deal_damage(enemy, enemy.hp, PURPLE, ttl=1200, txt="EXECUTE!")
+    else:
+        deal_damage(enemy, dmg, txt=f"-{int(dmg)}")
+
+    for fx in _hit_effects:
+        fx(enemy, dmg, now, executed)
+
+    # Kill bookkeeping happens in resolve_damage()
+    if enemy.hp <= 0 and _hit_berserk:
+        globals()["berserk_until_ms"] = now + 2500
 
 def handle_sword_attack(mx, my):
-    global score, player_hp
+    global player_hp
     kb = DEFAULTS["base_knockback"] * max(1, knockback_level)
     angle_to_mouse = math.atan2(my - player.centery, mx - player.centerx)
     melee_range = Assassin.KNIFE_RANGE if isinstance(player_class, Assassin) else DEFAULTS["sword_range"]
@@ -3284,7 +4458,9 @@ def handle_sword_attack(mx, my):
     assassin_backstab = isinstance(player_class, Assassin) and now_ms < assassin_invis_until_ms
     sword_dmg_mult = 1.5 if (flame_bomb_zone and isinstance(player_class, FlameArcher) and math.hypot(player.centerx - flame_bomb_zone["cx"], player.centery - flame_bomb_zone["cy"]) <= flame_bomb_zone["radius"]) else 1.0
 
-    for enemy in enemies[:]:
+    for enemy in enemies:
+        if enemy.hp <= 0:
+            continue
         ex = enemy.rect.centerx - player.centerx
         ey = enemy.rect.centery - player.centery
         dist = math.hypot(ex, ey)
@@ -3293,16 +4469,13 @@ def handle_sword_attack(mx, my):
             diff = abs((enemy_angle - angle_to_mouse + math.pi) % (2*math.pi) - math.pi)
             if diff <= math.radians(DEFAULTS["sword_arc_half_deg"]) * 1.05:
                 if assassin_backstab:
-                    if getattr(enemy, "is_boss", False):
-                        enemy.hp -= Assassin.BACKSTAB_BOSS_DAMAGE
-                        floating_texts.append({"x":enemy.rect.centerx,"y":enemy.rect.top-12,"txt":"BACKSTAB! -100","color":PURPLE,"ttl":1000,"vy":-0.6,"alpha":255})
+                    if enemy.is_boss:
+                        deal_damage(enemy, Assassin.BACKSTAB_BOSS_DAMAGE, PURPLE, txt="BACKSTAB! -100")
                     else:
-                        enemy.hp = 0
-                        floating_texts.append({"x":enemy.rect.centerx,"y":enemy.rect.top-12,"txt":"BACKSTAB!", "color":PURPLE,"ttl":1000,"vy":-0.6,"alpha":255})
+                        deal_damage(enemy, enemy.hp, PURPLE, txt="BACKSTAB!")
                 else:
                     sw_dmg = int(DEFAULTS["sword_damage"] * sword_dmg_mult)
-                    enemy.hp -= sw_dmg
-                    floating_texts.append({"x":enemy.rect.centerx,"y":enemy.rect.top-12,"txt":f"-{sw_dmg}","color":RED,"ttl":1000,"vy":-0.6,"alpha":255})
+                    deal_damage(enemy, sw_dmg)
                     if isinstance(player_class, Vampire):
                         heal = max(1, int(DEFAULTS["sword_damage"] * Vampire.LIFESTEAL_RATIO))
                         player_hp = min(max_hp, player_hp + heal)
@@ -3310,13 +4483,6 @@ def handle_sword_attack(mx, my):
                 if dist != 0 and not assassin_backstab:
                     enemy.rect.x += int(kb*(ex/dist))
                     enemy.rect.y += int(kb*(ey/dist))
-                if enemy.hp <= 0:
-                    record_flame_mastery_progress(enemy, dot_final_blow=False)
-                    record_assassin_kill(enemy)
-                    score += 1
-                    spawn_orb(enemy.rect.centerx, enemy.rect.centery, amount=1)
-                    try: enemies.remove(enemy)
-                    except: pass
 
 def shoot_bow(mx, my):
     # Class hook
@@ -3329,12 +4495,10 @@ def shoot_bow(mx, my):
     play_sound("arrow")
     num_shots = 2 if owned_abilities.get("Double Shot", False) else 1
     if num_shots == 2:
-        a1 = Arrow(player.centerx, player.centery, mx, my - 10, pierce=pierce_level)
-        a2 = Arrow(player.centerx, player.centery, mx, my + 10, pierce=pierce_level)
-        arrows.append(a1); arrows.append(a2)
+        acquire_arrow(player.centerx, player.centery, mx, my - 10, pierce=pierce_level)
+        acquire_arrow(player.centerx, player.centery, mx, my + 10, pierce=pierce_level)
     else:
-        a = Arrow(player.centerx, player.centery, mx, my, pierce=pierce_level)
-        arrows.append(a)
+        acquire_arrow(player.centerx, player.centery, mx, my, pierce=pierce_level)
 
 def spawn_robber_bullet(mx, my, damage_mult=1.0, spread_deg=0):
     """Spawn one bullet (Arrow with damage_override) for Robber guns."""
@@ -3347,14 +4511,13 @@ def spawn_robber_bullet(mx, my, damage_mult=1.0, spread_deg=0):
         ty = player.centery + dist * math.sin(ang)
     else:
         tx, ty = mx, my
-    a = Arrow(player.centerx, player.centery, tx, ty, pierce=0)
+    a = acquire_arrow(player.centerx, player.centery, tx, ty, pierce=0)
     a.damage_override = max(1, int(arrow_damage * damage_mult))
-    arrows.append(a)
 
 def update_robber_guns(now_ms, mx, my, mouse_held, clicked):
     """Handle Robber gun firing: AK (hold), minigun (charge then auto), shotgun (5 shots, 0.5s rate, 2.5s reload), sniper (slow)."""
     global last_robber_ak_ms, minigun_charge_start_ms, minigun_firing_until_ms, minigun_overheat_until_ms, minigun_last_bullet_ms
-    global last_robber_sniper_ms, score
+    global last_robber_sniper_ms
     global shotgun_shots_left, last_shotgun_shot_ms, shotgun_reload_until_ms
     gun = robbers_gun
     # Shotgun: when reload finishes, refill magazine
@@ -5809,9 +6972,21 @@ _FLAME_ARCHER_IMAGE_B64 = (
 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'
 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAArHqUKx6iXEv/9k='
 )
-_FLAME_ARCHER_IMAGE_B64 = "".join(_FLAME_ARCHER_IMAGE_B64)
+_flame_archer_path_cached = None
+_flame_archer_path_checked = False
+_flame_archer_surface = None
+_flame_archer_loaded = False
+
 def _flame_archer_image_path():
-    """Find the Flame Archer picture: flame_archer.png in assets/, or any .png in assets/, or next to game.py."""
+    """Find the Flame Archer picture: flame_archer.png in assets/, or any .png in assets/, or next to game.py.
+    The lookup runs once per launch."""
+    global _flame_archer_path_cached, _flame_archer_path_checked
+    if not _flame_archer_path_checked:
+        _flame_archer_path_cached = _find_flame_archer_image_path()
+        _flame_archer_path_checked = True
+    return _flame_archer_path_cached
+
+def _find_flame_archer_image_path():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     cwd = os.getcwd()
     # 1) Exact name in assets
@@ -5842,21 +7017,75 @@ def _flame_archer_expected_path():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     return os.path.normpath(os.path.join(script_dir, "assets", "flame_archer.png"))
 
+def _flame_archer_decoded_path():
+    """Cache file for the decoded embedded art, named by a hash of the embedded data."""
+    import hashlib
+    digest = hashlib.sha1(_FLAME_ARCHER_IMAGE_B64.encode("ascii")).hexdigest()[:12]
+    return os.path.join(_get_cache_dir(), f"flame_archer-{digest}.jpg")
+
+def _load_embedded_flame_archer_image():
+    """Embedded art: load the decoded copy from the cache, else decode the base64 once and write it there."""
+    try:
+        cached = _flame_archer_decoded_path()
+    except Exception:
+        cached = None
+    if cached and os.path.isfile(cached):
+        try:
+            return pygame.image.load(cached)
+        except Exception:
+            pass
+    data = base64.b64decode(_FLAME_ARCHER_IMAGE_B64)
+    if cached:
+        try:
+            with open(cached + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(cached + ".tmp", cached)
+        except Exception:
+            pass
+    return pygame.image.load(io.BytesIO(data), "flame_archer.jpg")
+
 def _load_flame_archer_image():
-    """Load Flame Archer picture: optional file in assets/ or next to game.py, else embedded (single file, no install)."""
+    """Load Flame Archer picture: optional file in assets/ or next to game.py, else embedded (single file, no install).
+    Decoded and converted once; later calls return the same surface."""
+    global _flame_archer_surface, _flame_archer_loaded
+    if _flame_archer_loaded:
+        return _flame_archer_surface
+    surf = None
     path = _flame_archer_image_path()
     if path:
         try:
             surf = pygame.image.load(path)
-            return surf.convert_alpha() if surf.get_flags() & pygame.SRCALPHA else surf.convert()
         except Exception:
-            pass
-    try:
-        data = base64.b64decode(_FLAME_ARCHER_IMAGE_B64)
-        surf = pygame.image.load(io.BytesIO(data))
-        return surf.convert_alpha() if surf.get_flags() & pygame.SRCALPHA else surf.convert()
-    except Exception:
+            surf = None
+    if surf is None:
+        try:
+            surf = _load_embedded_flame_archer_image()
+        except Exception:
+            surf = None
+    if surf is not None:
+        try:
+            surf = surf.convert_alpha() if surf.get_flags() & pygame.SRCALPHA else surf.convert()
+        except Exception:
+            surf = None
+    _flame_archer_surface = surf
+    _flame_archer_loaded = True
+    return surf
+
+def _flame_archer_image_scaled(max_size):
+    """Flame Archer picture scaled to fit a max_size square (never upscaled); cached per size."""
+    img = _load_flame_archer_image()
+    if img is None or max_size <= 0:
+        return None
+    iw, ih = img.get_size()
+    scale = min(max_size / max(1, iw), max_size / max(1, ih), 1.0)
+    size = (int(iw * scale), int(ih * scale))
+    if size[0] <= 0 or size[1] <= 0:
         return None
+    scaled = _flame_archer_scaled.get(size)
+    if scaled is None:
+        scaled = img if size == (iw, ih) else pygame.transform.smoothscale(img, size)
+        _flame_archer_scaled[size] = scaled
+    return scaled
 
 def draw_flame_archer_placeholder(surface, rect):
     """Draw the exact lava pit scene (no image file needed): same as the picture you gave — yellow-orange sky, wavy heat lines, lava, "Lava pit" sign, red block, "swim time" bubble."""
@@ -5944,8 +7173,6 @@ def flame_archer_mastery_panel():
     panel_h = min(720, HEIGHT - 24)
     panel = pygame.Rect((WIDTH - panel_w) // 2, (HEIGHT - panel_h) // 2, panel_w, panel_h)
     back_rect = pygame.Rect(panel.right - 120, panel.bottom - 52, 100, 44)
-    # Load image when panel opens (pygame display already init)
-    img_surf = _load_flame_archer_image()
     # Layout: [ description | PICTURE (square) | rewards + quests ]
     col_w = panel_w // 3
     left_x = panel.x + 24
@@ -5958,30 +7185,23 @@ def flame_archer_mastery_panel():
     pic_x = mid_x + 16 + (pic_avail_w - pic_size) // 2
     pic_y = panel.y + 64 + (pic_avail_h - pic_size) // 2
     pic_rect = pygame.Rect(pic_x, pic_y, pic_size, pic_size)
+    # Load image when panel opens (pygame display already init); None shows the placeholder text
+    scaled = _flame_archer_image_scaled(pic_size)
     while True:
-        screen.fill(bg_color)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 160))
-        screen.blit(overlay, (0, 0))
+        screen.blit(modal_backdrop((0, 0, 0, 160)), (0, 0))
         pygame.draw.rect(screen, UI_PANEL_BG, panel)
         pygame.draw.rect(screen, (255, 140, 50), panel, 4)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         # Title
         draw_text_centered(FONT_LG, "Flame Archer Mastery", panel.y + 24, (255, 180, 60), y_is_center=False)
         # Middle: square picture with shadow and frame
         shadow = pygame.Rect(pic_rect.x + 4, pic_rect.y + 4, pic_rect.w, pic_rect.h)
         pygame.draw.rect(screen, (20, 18, 16), shadow)
         pygame.draw.rect(screen, (50, 45, 42), pic_rect)
-        if img_surf is not None and pic_size > 0:
-            iw, ih = img_surf.get_size()
-            # Scale to fit inside square, preserve aspect ratio
-            scale = min(pic_size / max(1, iw), pic_size / max(1, ih), 1.0)
-            nw, nh = int(iw * scale), int(ih * scale)
-            if nw > 0 and nh > 0:
-                scaled = pygame.transform.smoothscale(img_surf, (nw, nh))
-                blit_x = pic_rect.centerx - nw // 2
-                blit_y = pic_rect.centery - nh // 2
-                screen.blit(scaled, (blit_x, blit_y))
+        if scaled is not None:
+            # Scaled to fit inside square, aspect ratio preserved
+            nw, nh = scaled.get_size()
+            screen.blit(scaled, (pic_rect.centerx - nw // 2, pic_rect.centery - nh // 2))
         else:
             t = FONT_SM.render("Image unavailable", True, (180, 160, 140))
             screen.blit(t, (pic_rect.centerx - t.get_width() // 2, pic_rect.centery - t.get_height() // 2))
@@ -6014,8 +7234,8 @@ def flame_archer_mastery_panel():
         if flame_mastery_unlocked:
             draw_text_centered(FONT_MD, "Mastery Unlocked!", panel.bottom - 80, (255, 220, 80), y_is_center=False)
         draw_button(back_rect, "Back", hover=back_rect.collidepoint(mx, my), text_color=UI_TEXT)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -6083,7 +7303,7 @@ def class_shop_menu():
         tab_gap = 12
         gem_tab_rect = pygame.Rect(WIDTH//2 - tab_w - tab_gap//2, tab_y, tab_w, tab_h)
         ach_tab_rect = pygame.Rect(WIDTH//2 + tab_gap//2, tab_y, tab_w, tab_h)
-        mx_cs, my_cs = pygame.mouse.get_pos()
+        mx_cs, my_cs = get_mouse_pos()
         for rect, label, key in [(gem_tab_rect, "Gem Classes", "gem"), (ach_tab_rect, "Achievement Classes", "achievement")]:
             sel = (class_shop_tab == key)
             fill = UI_BUTTON_HOVER if rect.collidepoint(mx_cs, my_cs) else (UI_PANEL_BG if sel else UI_BUTTON_BG)
@@ -6092,7 +7312,7 @@ def class_shop_menu():
             t = FONT_MD.render(label, True, UI_TEXT)
             screen.blit(t, (rect.centerx - t.get_width()//2, rect.centery - t.get_height()//2 - 1))
 
-        mx_cs, my_cs = pygame.mouse.get_pos()
+        mx_cs, my_cs = get_mouse_pos()
         buttons = []
         for i, cls in enumerate(vis):
             y = y_start + i * row_h
@@ -6133,9 +7353,9 @@ def class_shop_menu():
         back_y = y_start + n_classes * row_h + 8
         back_rect = pygame.Rect(WIDTH//2 - 120, min(back_y, HEIGHT - 60), 240, 56)
         draw_button(back_rect, "Back", hover=back_rect.collidepoint(mx_cs, my_cs), text_color=UI_TEXT)
-        pygame.display.flip()
+        present()
 
-        for ev in pygame.event.get():
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 save_game(); pygame.quit(); sys.exit()
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -6162,6 +7382,7 @@ def class_shop_menu():
                                 return
                             if owned:
                                 player_class = cls()
+                                rebuild_hit_pipeline()
                                 save_game()
                                 notify_once(f"{cls.name} equipped!", 800)
                                 return
@@ -6171,6 +7392,7 @@ def class_shop_menu():
                                 gems -= cost
                                 owned_classes.add(cls.name)
                                 player_class = cls()
+                                rebuild_hit_pipeline()
                                 save_game()
                                 notify_once(f"{cls.name} purchased!", 800)
                                 return
@@ -6200,14 +7422,11 @@ def lobby_screen():
     waiting = None  # "create" or "join" while waiting for server
 
     while True:
-        screen.fill(bg_color)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_DARK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(modal_backdrop(UI_OVERLAY_DARK), (0, 0))
         draw_text_centered(FONT_LG, "Online Lobby", HEIGHT//2 - 200, WHITE, y_is_center=True)
         draw_text_centered(FONT_SM, "Lobby name", name_y - 24, (200, 200, 200))
         draw_text_centered(FONT_SM, "Password", pass_y - 24, (200, 200, 200))
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
 
         for (y, text, is_pass) in [(name_y, lobby_name, False), (pass_y, lobby_password, True)]:
             disp = ("*" * len(text)) if is_pass else text
@@ -6244,9 +7463,9 @@ def lobby_screen():
                 draw_text_centered(FONT_XS, "Run in a terminal:  python game.py --server", HEIGHT//2 - 132, (140, 140, 140), y_is_center=True)
         else:
             draw_text_centered(FONT_XS, "Create a new lobby or join one with name + password", HEIGHT//2 - 250, (160, 160, 160), y_is_center=True)
-        pygame.display.flip()
+        present()
 
-        for ev in pygame.event.get():
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return "back"
             if ev.type == pygame.KEYDOWN:
@@ -6309,7 +7528,7 @@ def admin_code_entry_screen():
     while True:
         screen.fill(BLACK)
         draw_text_centered(FONT_MD, "Enter code", HEIGHT//2 - 100, (200, 200, 200), y_is_center=True)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         pygame.draw.rect(screen, (60, 60, 60), (bar_x - 2, bar_y - 2, bar_w + 4, bar_h + 4))
         pygame.draw.rect(screen, (40, 40, 40), (bar_x, bar_y, bar_w, bar_h))
         pygame.draw.rect(screen, (100, 100, 100), (bar_x, bar_y, bar_w, bar_h), 3)
@@ -6325,8 +7544,8 @@ def admin_code_entry_screen():
         escape_rect = pygame.Rect(escape_x - 4, HEIGHT - 40 - 2, escape_w + 8, escape_h + 4)
         escape_color = (140, 140, 140) if escape_rect.collidepoint(mx, my) else (100, 100, 100)
         draw_text_centered(FONT_XS, escape_txt, HEIGHT - 40, escape_color)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return
             if ev.type == pygame.KEYDOWN:
@@ -6468,17 +7687,16 @@ def admin_panel():
     max_scroll = max(0, content_height - HEIGHT + 60)
     panel_margin = 40
     panel_rect = pygame.Rect(panel_margin, 30, WIDTH - 2 * panel_margin, HEIGHT - 60)
+    backdrop = snapshot_backdrop((0, 0, 0, 200))
     while True:
         rects, keys, labels = build_buttons()
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        screen.blit(overlay, (0, 0))
+        screen.blit(backdrop, (0, 0))
         pygame.draw.rect(screen, (28, 45, 35), panel_rect)
         pygame.draw.rect(screen, (60, 120, 80), panel_rect, 5)
         draw_text_centered(FONT_LG, "Admin Panel", 52, (220, 255, 220))
         draw_text_centered(FONT_SM, f"Code: {ADMIN_CODE_DISPLAY}", 92, (180, 200, 180))
         draw_text_centered(FONT_XS, f"HP: {player_hp}/{max_hp}  Dmg: {arrow_damage}  Gems: {gems}  Wave: {wave}" + ("  [GOD]" if admin_god_mode else ""), 118, (140, 160, 140))
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         content_my = my + scroll_y
         for i, (rect, label) in enumerate(zip(rects, labels)):
             draw_y = rect.y - scroll_y
@@ -6495,8 +7713,8 @@ def admin_panel():
             screen.blit(font.render(label_fit, True, (220, 240, 220)), (draw_rect.x + (draw_rect.w - w) // 2, draw_rect.y + (draw_rect.h - font.get_height()) // 2))
         if max_scroll > 0:
             draw_text_centered(FONT_XS, "Scroll: mouse wheel", HEIGHT - 26, (120, 140, 120))
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -6525,7 +7743,7 @@ def admin_panel():
                         player_exp = 0
                         exp_required = 10 + 10 * (player_level - 1)
                     elif key == "skip_wave":
-                        enemies.clear()
+                        clear_enemies()
                         in_collection_phase = True
                         collection_start_ms = pygame.time.get_ticks() - collection_duration_ms - 100
                     elif key == "knockback":
@@ -6537,13 +7755,14 @@ def admin_panel():
                     elif key == "god":
                         admin_god_mode = not admin_god_mode
                     elif key == "clear_enemies":
-                        enemies.clear()
+                        clear_enemies()
                     elif key == "all_abilities":
                         for k in ABILITY_RARITY:
                             owned_abilities[k] = True
                         knockback_level = 5
                         pierce_level = 3
                         corrosive_level = 5
+                        rebuild_hit_pipeline()
                     elif key == "corrosive_max":
                         owned_abilities["Corrosive"] = True
                         corrosive_level = 5
@@ -6564,6 +7783,7 @@ def admin_panel():
                     elif isinstance(key, tuple) and key[0] == "ability":
                         ab_name = key[1]
                         owned_abilities[ab_name] = not owned_abilities.get(ab_name, False)
+                        rebuild_hit_pipeline()
                         if ab_name == "Knockback" and owned_abilities[ab_name]:
                             knockback_level = min(5, knockback_level + 1)
                         if ab_name == "Piercing" and owned_abilities[ab_name]:
@@ -6587,16 +7807,13 @@ def settings_menu():
     music_rect = pygame.Rect(panel.centerx + 80, panel.y + 268, 120, 44)
     difficulty_rect = pygame.Rect(panel.centerx + 80, panel.y + 318, 120, 44)
     while True:
-        screen.fill(bg_color)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_DARK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(modal_backdrop(UI_OVERLAY_DARK), (0, 0))
         pygame.draw.rect(screen, UI_PANEL_BG, panel)
         pygame.draw.rect(screen, UI_BORDER, panel, 4)
         title_surf = FONT_LG.render("Settings", True, UI_TEXT)
         title_x = panel.x + (panel.w - title_surf.get_width()) // 2
         screen.blit(title_surf, (title_x, panel.y + 14))
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         vol = settings.get("volume", 0.7)
         vol_label = FONT_MD.render("Volume", True, UI_TEXT)
         screen.blit(vol_label, (slider_x, slider_y - 26))
@@ -6632,9 +7849,9 @@ def settings_menu():
         dt_surf = FONT_MD.render(diff_txt, True, UI_TEXT)
         screen.blit(dt_surf, (difficulty_rect.x + (difficulty_rect.w - dt_surf.get_width()) // 2, difficulty_rect.y + (difficulty_rect.h - dt_surf.get_height()) // 2 - 1))
         draw_button(back_rect, "Back", hover=back_rect.collidepoint(mx, my), text_color=UI_TEXT)
-        pygame.display.flip()
+        present()
 
-        for ev in pygame.event.get():
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
@@ -6673,6 +7890,7 @@ def settings_menu():
                 mx = ev.pos[0]
                 v = max(0, min(1, (mx - slider_x) / (slider_w or 1)))
                 settings["volume"] = v
+                apply_music_volume()
                 save_settings()
         clock.tick(FPS)
 
@@ -6701,15 +7919,12 @@ def update_log_panel():
     total_h = sum(len(wrap_text_to_width(FONT_SM, f"• {line}", content_w)) * line_h for line in UPDATE_LOG_ENTRIES)
     max_scroll = max(0, total_h - (panel_h - 80))
     while True:
-        screen.fill(bg_color)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_DARK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(modal_backdrop(UI_OVERLAY_DARK), (0, 0))
         pygame.draw.rect(screen, UI_PANEL_BG, panel)
         pygame.draw.rect(screen, UI_BORDER, panel, 4)
         title = FONT_LG.render("Update Log", True, UI_TEXT)
         screen.blit(title, (panel.centerx - title.get_width()//2, panel.y + 12))
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         clip = pygame.Rect(panel.x + 12, panel.y + 52, panel.w - 24, panel_h - 100)
         content_w = panel.w - 32
         screen.set_clip(clip)
@@ -6724,8 +7939,8 @@ def update_log_panel():
                 content_y += line_h
         screen.set_clip(None)
         draw_button(back_rect, "Back", hover=back_rect.collidepoint(mx, my), text_color=UI_TEXT)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 return
             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
@@ -6763,7 +7978,7 @@ def daily_challenge_page():
 
     while True:
         screen.fill(bg_color)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
 
         # Title
         draw_text_centered(FONT_LG, "Daily Challenge", title_y, (180, 100, 20), y_is_center=False)
@@ -6823,9 +8038,9 @@ def daily_challenge_page():
             start_txt = FONT_MD.render("Already done", True, UI_TEXT_MUTED)
             screen.blit(start_txt, (start_rect.x + (start_rect.w - start_txt.get_width()) // 2, start_rect.y + (start_rect.h - start_txt.get_height()) // 2 - 1))
 
-        pygame.display.flip()
+        present()
 
-        for ev in pygame.event.get():
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -6851,20 +8066,17 @@ def name_entry_screen():
     bar_y = HEIGHT // 2 - 30
     continue_rect = pygame.Rect(WIDTH // 2 - 80, HEIGHT // 2 + 50, 160, 50)
     while True:
-        screen.fill(bg_color)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_DARK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(modal_backdrop(UI_OVERLAY_DARK), (0, 0))
         draw_text_centered(FONT_LG, "Welcome", HEIGHT // 2 - 120, UI_TEXT, y_is_center=True)
         draw_text_centered(FONT_MD, "Enter your name", bar_y - 36, (200, 200, 200))
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         pygame.draw.rect(screen, (50, 50, 50), (bar_x - 2, bar_y - 2, bar_w + 4, bar_h + 4))
         pygame.draw.rect(screen, (80, 80, 80), (bar_x, bar_y, bar_w, bar_h), 3)
         prompt = FONT_MD.render(name + ("|" if (pygame.time.get_ticks() // 500) % 2 else ""), True, (240, 240, 240))
         screen.blit(prompt, (bar_x + 16, bar_y + (bar_h - prompt.get_height()) // 2))
         draw_button(continue_rect, "Continue", hover=continue_rect.collidepoint(mx, my), text_color=UI_TEXT)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -6903,13 +8115,10 @@ def tutorial_screen():
     next_rect = pygame.Rect(panel.right - 130, panel.bottom - 52, 110, 44)
     skip_rect = pygame.Rect(panel.x + 20, panel.bottom - 52, 80, 44)
     while True:
-        screen.fill(bg_color)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 140))
-        screen.blit(overlay, (0, 0))
+        screen.blit(modal_backdrop((0, 0, 0, 140)), (0, 0))
         pygame.draw.rect(screen, UI_PANEL_BG, panel)
         pygame.draw.rect(screen, UI_BORDER, panel, 4)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
         title, body = slides[idx]
         title_fit = truncate_text_to_width(FONT_LG, title, panel_w - 24)
         title_surf = FONT_LG.render(title_fit, True, UI_TEXT)
@@ -6928,8 +8137,8 @@ def tutorial_screen():
         else:
             next_rect = pygame.Rect(panel.centerx - 55, panel.bottom - 52, 110, 44)
             draw_button(next_rect, "Got it!", hover=next_rect.collidepoint(mx, my), text_color=UI_TEXT)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -6958,6 +8167,8 @@ def main_menu():
     global current_save_slot, daily_challenge_active, daily_modifiers, online_mode, net
     refresh_all_slot_meta()
     start_background_music()
+    startup_mark("main_menu setup")
+    first_frame = True
 
     while True:
         screen.fill(bg_color)
@@ -6965,7 +8176,7 @@ def main_menu():
         title_shadow = FONT_LG.render("Infinite Archer", True, (180, 184, 192))
         screen.blit(title_shadow, (WIDTH//2 - title_shadow.get_width()//2 + 2, HEIGHT//6 + 2))
         draw_text_centered(FONT_LG, "Infinite Archer", HEIGHT//6, BLACK)
-        mx, my = pygame.mouse.get_pos()
+        mx, my = get_mouse_pos()
 
         btn_w, btn_h = 360, 52
         btn_gap = 36
@@ -7013,9 +8224,16 @@ def main_menu():
             pygame.draw.rect(screen, dc, d)
             pygame.draw.rect(screen, RED, d, 3)
             screen.blit(FONT_XS.render("Delete", True, UI_TEXT), (d.x + (d.w - FONT_XS.size("Delete")[0])//2, d.y + 5))
-        pygame.display.flip()
-
-        for ev in pygame.event.get():
+        present()
+        if first_frame:
+            first_frame = False
+            startup_mark("main_menu first frame")
+            if PROFILE_STARTUP:
+                report_startup_profile()
+                pygame.quit(); sys.exit(0)
+            _ensure_sounds()
+
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
@@ -7098,17 +8316,14 @@ def main_menu():
 
 def game_over_screen(daily_granted=False):
     while True:
-        screen.fill(bg_color)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(UI_OVERLAY_DARK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(modal_backdrop(UI_OVERLAY_DARK), (0, 0))
         draw_text_centered(FONT_LG, "Game Over", HEIGHT//2 - 120, (220, 60, 60), y_is_center=True)
         stats = f"Wave: {wave}  •  Score: {score}  •  Gems this run: {gems_this_run}"
         stats_max_w = WIDTH - 40
         stats_lines = wrap_text_to_width(FONT_MD, stats, stats_max_w)
         if not stats_lines:
             stats_lines = [stats[:50]]
-        stats_font = FONT_MD if FONT_MD.render(stats_lines[0], True, BLACK).get_width() <= stats_max_w else FONT_SM
+        stats_font = FONT_MD if text_width(FONT_MD, stats_lines[0]) <= stats_max_w else FONT_SM
         stats_lines = wrap_text_to_width(stats_font, stats, stats_max_w) if stats_lines else [stats]
         stats_y = HEIGHT//2 - 50 - (len(stats_lines) - 1) * (stats_font.get_height() + 4) // 2
         for i, ln in enumerate(stats_lines):
@@ -7124,8 +8339,8 @@ def game_over_screen(daily_granted=False):
             screen.blit(reward_msg, (reward_box.centerx - reward_msg.get_width()//2, reward_box.centery - reward_msg.get_height()//2 - 1))
         prompt_y = HEIGHT//2 + (72 if daily_granted else 20)
         draw_text_centered(FONT_SM, "Click or press Enter to return to menu", prompt_y, UI_TEXT_MUTED, y_is_center=True)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if ev.type == pygame.MOUSEBUTTONDOWN or (ev.type == pygame.KEYDOWN and ev.key == pygame.K_RETURN):
@@ -7133,9 +8348,185 @@ def game_over_screen(daily_granted=False):
         clock.tick(FPS)
 
 # ---------- Main Loop ----------
+# ---------- FRAME PROFILER ----------
+# F3 in game toggles a frame-time overlay; python game.py --profile-frames also appends one row per frame
+# to frame_profile.csv in the data folder. game_loop guards every hook with "if frame_prof_on:", so
+# with the profiler off a hook costs one global lookup.
+FRAME_PROF_SECTIONS = ("events", "abilities", "projectiles", "enemies", "collisions", "collection", "draw", "fx", "flip")
+FRAME_PROF_COUNTS = ("enemies", "arrows", "enemy_arrows", "floating_texts", "small_dots", "pending_orbs")
+PROFILE_FRAMES_CSV = "--profile-frames" in sys.argv
+frame_prof_on = PROFILE_FRAMES_CSV
+
+class FrameProfiler:
+    WINDOW = 120  # frames in the rolling averages
+    PANEL_REFRESH = 15  # re-render the overlay text every N frames
+
+    def __init__(self):
+        self.show = False
+        self.csv = None
+        self.frame = 0
+        self.t = 0
+        self.frame_start = 0
+        self.cur = [0] * len(FRAME_PROF_SECTIONS)
+        self.index = {name: i for i, name in enumerate(FRAME_PROF_SECTIONS)}
+        self.ring = [[0] * (len(FRAME_PROF_SECTIONS) + 1) for _ in range(self.WINDOW)]
+        self.sums = [0] * (len(FRAME_PROF_SECTIONS) + 1)  # per section, then whole frame (ns)
+        self.panel = None
+
+    def begin(self):
+        self.t = self.frame_start = time.perf_counter_ns()
+        for i in range(len(self.cur)):
+            self.cur[i] = 0
+
+    def mark(self, section):
+        """Charge the time since the previous mark to section."""
+        now = time.perf_counter_ns()
+        self.cur[self.index[section]] += now - self.t
+        self.t = now
+
+    def end(self):
+        total = time.perf_counter_ns() - self.frame_start
+        slot = self.ring[self.frame % self.WINDOW]
+        for i, v in enumerate(self.cur + [total]):
+            self.sums[i] += v - slot[i]
+            slot[i] = v
+        self.frame += 1
+        counts = [len(globals()[name]) for name in FRAME_PROF_COUNTS]
+        if self.csv is not None:
+            row = [self.frame, f"{total / 1e6:.3f}", f"{clock.get_fps():.1f}"] + counts + [f"{v / 1e6:.3f}" for v in self.cur]
+            self.csv.write(",".join(str(v) for v in row) + "\n")
+        if self.show and (self.panel is None or self.frame % self.PANEL_REFRESH == 0):
+            self.panel = self._render_panel(counts)
+
+    def open_csv(self):
+        path = os.path.join(_get_data_dir(), "frame_profile.csv")
+        try:
+            self.csv = open(path, "w", encoding="utf-8", buffering=1)
+        except OSError:
+            self.csv = None
+            return
+        self.csv.write(",".join(("frame", "frame_ms", "fps") + FRAME_PROF_COUNTS + tuple(f"{s}_ms" for s in FRAME_PROF_SECTIONS)) + "\n")
+        print(f"Frame profile: {path}")
+
+    def _render_panel(self, counts):
+        n = max(1, min(self.frame, self.WINDOW))
+        rows = [("frame", f"{self.sums[-1] / n / 1e6:.2f} ms"), ("fps", f"{clock.get_fps():.1f}")]
+        rows += [(name, f"{self.sums[i] / n / 1e6:.2f} ms") for i, name in enumerate(FRAME_PROF_SECTIONS)]
+        rows += [(name, str(c)) for name, c in zip(FRAME_PROF_COUNTS, counts)]
+        line_h = FONT_XS.get_linesize()
+        surfs = [(FONT_XS.render(label, True, WHITE), FONT_XS.render(value, True, WHITE)) for label, value in rows]
+        width = max(ls.get_width() for ls, _ in surfs) + max(vs.get_width() for _, vs in surfs) + 32
+        panel = pygame.Surface((width, line_h * len(surfs) + 12), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for k, (label_surf, value_surf) in enumerate(surfs):
+            panel.blit(label_surf, (8, 6 + k * line_h))
+            panel.blit(value_surf, (width - 8 - value_surf.get_width(), 6 + k * line_h))
+        return panel
+
+    def panel_rect(self):
+        return self.panel.get_rect(topright=(WIDTH - 10, 140))
+
+    def draw(self, surface):
+        if self.show and self.panel is not None:
+            surface.blit(self.panel, self.panel_rect())
+
+frame_prof = FrameProfiler()
+
+def toggle_frame_profiler():
+    global frame_prof_on
+    frame_prof.show = not frame_prof.show
+    frame_prof.panel = None
+    was_on = frame_prof_on
+    frame_prof_on = frame_prof.show or frame_prof.csv is not None
+    if frame_prof_on and not was_on:
+        # begin() was skipped for this frame; start timing here instead of from a stale (or zero) mark
+        frame_prof.begin()
+
+# ---------- Fixed timestep ----------
+# game_loop advances the simulation in fixed SIM_STEP_MS steps (as many as real time has accumulated,
+# at most MAX_SIM_STEPS per frame) and renders once per frame, capped at settings "max_fps" (0 = no cap).
+# Moving things are drawn between their last two simulated positions so motion stays smooth when the
+# render rate and the simulation rate differ.
+SIM_HZ = 60
+SIM_STEP_MS = 1000.0 / SIM_HZ
+MAX_SIM_STEPS = 5  # beyond this the game slows down instead of falling further behind
+INTERP_SNAP_PX = 64  # larger jumps (teleport, wave reset) are drawn at the new position
+MAX_RENDER_FPS = settings.get("max_fps", FPS)
+
+def interpolation_shifts(alpha, player_prev):
+    """(rect, dx, dy) moves that take the player, enemies and projectiles from their current position
+    back to where they were a fraction alpha of the way through the last step."""
+    back = 1.0 - alpha
+    shifts = []
+    def add(rect, dx, dy):
+        dx = round(dx * back)
+        dy = round(dy * back)
+        if (dx or dy) and abs(dx) <= INTERP_SNAP_PX and abs(dy) <= INTERP_SNAP_PX:
+            shifts.append((rect, dx, dy))
+    add(player, player_prev[0] - player.x, player_prev[1] - player.y)
+    for e in enemies:
+        add(e.rect, e.px - e.rect.x, e.py - e.rect.y)
+    for a in arrows:
+        add(a.rect, a.px - a.x, a.py - a.y)
+    for ea in enemy_arrows:
+        add(ea.rect, ea.px - ea.x, ea.py - ea.y)
+    return shifts
+
+# ---------- Dirty-rect rendering ----------
+# Optional (settings "dirty_rects", or --dirty-rects): instead of clearing and flipping the whole
+# window, game_loop repaints the flat background only under what the previous frame drew and pushes
+# just those areas plus this frame's with display.update(rects). Frames with large effects, and
+# the first frame after a modal screen, are cleared and flipped in full as before.
+DIRTY_RECTS = "--dirty-rects" in sys.argv or settings.get("dirty_rects", False)
+_dirty_prev_rects = []
+_dirty_prev_tracked = False  # previous frame's pixels are all covered by _dirty_prev_rects
+
+def request_full_redraw():
+    global _dirty_prev_tracked
+    _dirty_prev_tracked = False
+
+def frame_has_big_effects(banner_active):
+    """True when this frame draws something too large or irregular to track by rect."""
+    return (banner_active or flame_bomb_zone is not None or flame_bomb_ball is not None
+            or flame_archer_flame_active or lightning_lines or explosive_fx
+            or (owned_abilities.get("Corrosive", False) and corrosive_level >= 1)
+            or chat_open or chat_messages or isinstance(player_class, Hacker))
+
+def collect_frame_rects():
+    """Screen areas the game_loop draw pass touches when frame_has_big_effects() is False."""
+    reach = max(66, int(DEFAULTS["sword_range"]) + 6)  # bow, gun and sword lines around the player
+    rects = [pygame.Rect(0, 0, WIDTH, 136), pygame.Rect(0, HEIGHT - 64, WIDTH, 64),
+             pygame.Rect(player.centerx - reach, player.centery - reach, reach * 2, reach * 2).union(player)]
+    if spawn_preview_active:
+        rects.extend(pygame.Rect(int(rx - 17), int(ry - 17), 34, 34) for rx, ry in spawn_pattern_positions[:int(enemies_per_wave)])
+    rects.extend(pygame.Rect(a.rect.x, a.rect.y, 32, 32) for a in arrows)  # rotated 30x6 sprite
+    rects.extend(pygame.Rect(int(ra.x), int(ra.y), 28, 28) for ra in remote_arrows)
+    rects.extend(ea.rect.copy() for ea in enemy_arrows)
+    rects.extend(pygame.Rect(e.rect.x - 1, e.rect.y - 10, e.rect.w + 2, e.rect.h + 11) for e in enemies)  # + DoT dots
+    rects.extend(pending_orbs.rects())
+    rects.extend(pygame.Rect(int(d["x"]) - 4, int(d["y"]) - 4, 8, 8) for d in small_dots)
+    if frame_prof.show and frame_prof.panel is not None:
+        rects.append(frame_prof.panel_rect())
+    line_h = FONT_SM.get_height()
+    for ft in floating_texts:  # outlined text: one pixel of outline on every side
+        rects.append(pygame.Rect(int(ft.get("x", 0)) - 1, int(ft.get("y", 0)) - 1,
+                                 text_width(FONT_SM, str(ft.get("txt", ""))) + 2, line_h + 2))
+    return rects
+
+def present_frame(tracked, dirty_frame):
+    """Show the frame: display.update over old + new areas for a dirty frame, otherwise flip."""
+    global _dirty_prev_rects, _dirty_prev_tracked
+    rects = collect_frame_rects() if tracked else []
+    if dirty_frame and screen is window:
+        pygame.display.update(_dirty_prev_rects + rects)
+    else:
+        present()
+    _dirty_prev_rects = rects
+    _dirty_prev_tracked = tracked
+
 def game_loop():
-    global weapon, wave, enemies_per_wave, score, player_hp
-    global player_exp, player_level, exp_required, gems
+    global weapon, wave, enemies_per_wave, player_hp
+    global player_exp, player_level, exp_required
     global gems_this_run
     global in_collection_phase, collection_start_ms, collection_duration_ms
     global spawn_preview_active, spawn_preview_start_ms, spawn_preview_ms
@@ -7155,6 +8546,7 @@ def game_loop():
     player.center = (WIDTH//2, HEIGHT//2)
     if not isinstance(player_class, Knight):
         weapon = "bow"
+    rebuild_hit_pipeline()
 
     spawn_preview_active = True
     spawn_preview_start_ms = pygame.time.get_ticks()
@@ -7163,9 +8555,17 @@ def game_loop():
     last_corrosive_damage_ms = 0
     wave_banner_until_ms = 0
     wave_banner_number = 0
+    request_full_redraw()
+    if PROFILE_FRAMES_CSV and frame_prof.csv is None:
+        frame_prof.open_csv()
+    sim_accum = 0.0
+    player_prev = player.topleft
+    if wave % 20 != 0:
+        prepare_wave_template(wave, wave_enemy_count(enemies_per_wave))
 
     while running:
-        dt = clock.tick(FPS) 
+        dt = clock.tick(MAX_RENDER_FPS)
+        if frame_prof_on: frame_prof.begin()
         now_ms = pygame.time.get_ticks()
         update_fx(dt)
         vampire_fly = (isinstance(player_class, Vampire) and now_ms < vampire_fly_until_ms) or (isinstance(player_class, Hacker) and now_ms < hacker_fly_until_ms)
@@ -7176,7 +8576,7 @@ def game_loop():
         except Exception:
             pass
 
-        for ev in pygame.event.get():
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 save_game(); pygame.quit(); sys.exit()
 
@@ -7211,6 +8611,10 @@ def game_loop():
                             chat_input += ev.unicode
                         continue
 
+                if ev.key == pygame.K_F3:
+                    toggle_frame_profiler()
+                    continue
+
                 # Admin trigger: 6543 in sequence → black screen to type code and Submit
                 if ev.key in ADMIN_TRIGGER:
                     expected = ADMIN_TRIGGER[len(admin_code_buffer)]
@@ -7219,6 +8623,7 @@ def game_loop():
                         if len(admin_code_buffer) == 4:
                             admin_code_buffer = []
                             admin_code_entry_screen()
+                            request_full_redraw()
                             continue
                     else:
                         admin_code_buffer = []
@@ -7228,6 +8633,7 @@ def game_loop():
                 # normal controls
                 if ev.key == pygame.K_ESCAPE:
                     action = pause_menu()
+                    request_full_redraw()
                     if action == "quit":
                         save_game()
                         return
@@ -7269,7 +8675,7 @@ def game_loop():
                             d = math.hypot(dx, dy) or 1
                             dx, dy = dx / d, dy / d
                         else:
-                            mx, my = pygame.mouse.get_pos()
+                            mx, my = get_mouse_pos()
                             dx = mx - player.centerx
                             dy = my - player.centery
                             d = math.hypot(dx, dy) or 1
@@ -7286,6 +8692,7 @@ def game_loop():
                         floating_texts.append({"x": player.centerx, "y": player.centery - 30, "txt": "Overcharge!", "color": (120, 255, 120), "ttl": 800, "vy": -0.5, "alpha": 255})
                 if ev.key == pygame.K_b and isinstance(player_class, Assassin):
                     hit_list_menu()
+                    request_full_redraw()
                     continue
                 # Flame Bomb (Flame Archer mastery): F = throw ball, F again = create zone
                 if ev.key == pygame.K_f and isinstance(player_class, FlameArcher) and flame_mastery_unlocked:
@@ -7300,7 +8707,7 @@ def game_loop():
                         }
                         flame_bomb_ball = None
                     else:
-                        mx, my = pygame.mouse.get_pos()
+                        mx, my = get_mouse_pos()
                         dx = mx - player.centerx
                         dy = my - player.centery
                         d = math.hypot(dx, dy) or 1.0
@@ -7315,18 +8722,7 @@ def game_loop():
                 if ev.key == pygame.K_2 and isinstance(player_class, FlameArcher) and flame_mastery_unlocked:
                     flame_archer_weapon = "flamethrower"
                 if in_collection_phase and ev.key == pygame.K_SPACE:
-                    for orb in pending_orbs[:]:
-                        player_exp += orb["amount"]
-                        amt = max(1, int(round(orb["amount"] * daily_gem_mult())))
-                        gems += amt
-                        gems_this_run += amt
-                        if owned_abilities.get("Bounty", False) and random.random() < 0.25:
-                            gems += 1
-                            gems_this_run += 1
-                        if owned_abilities.get("Scavenger", False) and random.random() < 0.20:
-                            player_exp += 5
-                        try: pending_orbs.remove(orb)
-                        except: pass
+                    collect_orbs(pending_orbs.take_all())
                     collection_start_ms = now_ms - collection_duration_ms - 1
 
             if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
@@ -7361,6 +8757,7 @@ def game_loop():
                 admin_btn = pygame.Rect(12, HEIGHT - 32, 52, 24)
                 if admin_btn.collidepoint(mx, my):
                     admin_panel()
+                    request_full_redraw()
                     continue
                 # Hit List button (Assassin only)
                 if isinstance(player_class, Assassin):
@@ -7368,24 +8765,11 @@ def game_loop():
                     hitlist_btn = pygame.Rect(WIDTH - 230, hitlist_btn_y, 100, 40)
                     if hitlist_btn.collidepoint(mx, my):
                         hit_list_menu()
+                        request_full_redraw()
                         continue
 
                 if in_collection_phase:
-                    for orb in pending_orbs[:]:
-                        rect = pygame.Rect(orb["x"]-8, orb["y"]-8, 16, 16)
-                        if rect.collidepoint(mx,my):
-                            player_exp += orb["amount"]
-                            amt = max(1, int(round(orb["amount"] * daily_gem_mult())))
-                            gems += amt
-                            gems_this_run += amt
-                            if owned_abilities.get("Bounty", False) and random.random() < 0.25:
-                                gems += 1
-                                gems_this_run += 1
-                            if owned_abilities.get("Scavenger", False) and random.random() < 0.20:
-                                player_exp += 5
-                            try: pending_orbs.remove(orb)
-                            except: pass
-                            break
+                    collect_orbs([pending_orbs.take_at(mx, my)])
                     continue
 
                 if isinstance(player_class, Robber):
@@ -7397,307 +8781,286 @@ def game_loop():
                 elif isinstance(player_class, Knight) and weapon == "sword":
                     handle_sword_attack(mx,my)
 
-        # Flame Bomb: update ball position; update zone ttl and apply burn to enemies in zone
-        if flame_bomb_ball is not None:
-            flame_bomb_ball["x"] += flame_bomb_ball["vx"]
-            flame_bomb_ball["y"] += flame_bomb_ball["vy"]
-            if not screen.get_rect().collidepoint(flame_bomb_ball["x"], flame_bomb_ball["y"]):
-                flame_bomb_ball = None
-        if flame_bomb_zone is not None:
-            flame_bomb_zone["ttl_ms"] -= dt
-            if flame_bomb_zone["ttl_ms"] <= 0:
-                flame_bomb_zone = None
-            else:
-                if now_ms - flame_bomb_zone.get("last_burn_tick_ms", 0) >= FLAME_BOMB_ZONE_TICK_MS:
-                    flame_bomb_zone["last_burn_tick_ms"] = now_ms
-                    cx = flame_bomb_zone["cx"]
-                    cy = flame_bomb_zone["cy"]
-                    r = flame_bomb_zone["radius"]
-                    dmg = max(1, int(arrow_damage * FLAME_BOMB_ZONE_DMG_PER_TICK))
-                    for e in enemies[:]:
-                        if math.hypot(e.rect.centerx - cx, e.rect.centery - cy) <= r:
-                            e.hp -= dmg
-                            e.burn_ms_left = max(getattr(e, "burn_ms_left", 0), FLAME_BOMB_ZONE_BURN_MS)
-                            e.last_status_tick = 0
-                            floating_texts.append({"x": e.rect.centerx, "y": e.rect.top - 12, "txt": f"-{dmg}", "color": ORANGE, "ttl": 800, "vy": -0.5, "alpha": 255})
-                            if e.hp <= 0:
-                                record_flame_mastery_progress(e, dot_final_blow=False)
-                                record_assassin_kill(e)
-                                score += 1
-                                spawn_orb(e.rect.centerx, e.rect.centery, amount=1)
-                                try: enemies.remove(e)
-                                except: pass
-
-        def _player_in_flame_bomb_zone():
-            if flame_bomb_zone is None:
-                return False
-            return math.hypot(player.centerx - flame_bomb_zone["cx"], player.centery - flame_bomb_zone["cy"]) <= flame_bomb_zone["radius"]
-
-        # movement (disabled while typing). Vampire fly = 1.5x speed; Flame Bomb zone = 1.5x speed
-        keys = pygame.key.get_pressed()
-        if not chat_open:
-            archer_dashing = isinstance(player_class, NoClass) and now_ms < archer_dash_until_ms
-            if archer_dashing:
-                player.x += int(archer_dash_vx * ARCHER_DASH_SPEED)
-                player.y += int(archer_dash_vy * ARCHER_DASH_SPEED)
+        if frame_prof_on: frame_prof.mark("events")
+
+        # simulation: one fixed step per SIM_STEP_MS of real time (a long stall counts as one step)
+        sim_accum = min(sim_accum + (dt if dt <= 250 else SIM_STEP_MS), SIM_STEP_MS * MAX_SIM_STEPS)
+        while sim_accum >= SIM_STEP_MS:
+            sim_accum -= SIM_STEP_MS
+            player_prev = player.topleft
+            for e in enemies:
+                e.px, e.py = e.rect.x, e.rect.y
+
+            # Flame Bomb: update ball position; update zone ttl and apply burn to enemies in zone
+            if flame_bomb_ball is not None:
+                flame_bomb_ball["x"] += flame_bomb_ball["vx"]
+                flame_bomb_ball["y"] += flame_bomb_ball["vy"]
+                if not screen.get_rect().collidepoint(flame_bomb_ball["x"], flame_bomb_ball["y"]):
+                    flame_bomb_ball = None
+            if flame_bomb_zone is not None:
+                flame_bomb_zone["ttl_ms"] -= SIM_STEP_MS  # float: a rounded 17 ms step would run ~2% fast
+                if flame_bomb_zone["ttl_ms"] <= 0:
+                    flame_bomb_zone = None
+                else:
+                    if now_ms - flame_bomb_zone.get("last_burn_tick_ms", 0) >= FLAME_BOMB_ZONE_TICK_MS:
+                        flame_bomb_zone["last_burn_tick_ms"] = now_ms
+                        cx = flame_bomb_zone["cx"]
+                        cy = flame_bomb_zone["cy"]
+                        r = flame_bomb_zone["radius"]
+                        dmg = max(1, int(arrow_damage * FLAME_BOMB_ZONE_DMG_PER_TICK))
+                        for e in enemies:
+                            if e.hp > 0 and math.hypot(e.rect.centerx - cx, e.rect.centery - cy) <= r:
+                                deal_damage(e, dmg, ORANGE, ttl=800, vy=-0.5)
+                                e.burn_ms_left = max(e.burn_ms_left, FLAME_BOMB_ZONE_BURN_MS)
+                                e.restart_status_tick(now_ms)
+
+            def _player_in_flame_bomb_zone():
+                if flame_bomb_zone is None:
+                    return False
+                return math.hypot(player.centerx - flame_bomb_zone["cx"], player.centery - flame_bomb_zone["cy"]) <= flame_bomb_zone["radius"]
+
+            # movement (disabled while typing). Vampire fly = 1.5x speed; Flame Bomb zone = 1.5x speed
+            keys = pygame.key.get_pressed()
+            if not chat_open:
+                archer_dashing = isinstance(player_class, NoClass) and now_ms < archer_dash_until_ms
+                if archer_dashing:
+                    player.x += int(archer_dash_vx * ARCHER_DASH_SPEED)
+                    player.y += int(archer_dash_vy * ARCHER_DASH_SPEED)
+                else:
+                    speed = player_speed * (Vampire.FLY_SPEED_MULT if vampire_fly else 1.0)
+                    if isinstance(player_class, FlameArcher) and _player_in_flame_bomb_zone():
+                        speed *= 1.5
+                    if keys[pygame.K_w]: player.y -= speed
+                    if keys[pygame.K_s]: player.y += speed
+                    if keys[pygame.K_a]: player.x -= speed
+                    if keys[pygame.K_d]: player.x += speed
+            player.clamp_ip(screen.get_rect())
+
+            # Robber: hold-to-fire (AK) and minigun auto-fire
+            if isinstance(player_class, Robber):
+                mx, my = get_mouse_pos()
+                update_robber_guns(now_ms, mx, my, pygame.mouse.get_pressed()[0], False)
+
+            # Flame Archer mastery: flamethrower in slot 3 (hold left mouse when selected)
+            if isinstance(player_class, FlameArcher) and flame_mastery_unlocked:
+                left_held = pygame.mouse.get_pressed()[0]
+                flame_archer_flame_active = (flame_archer_weapon == "flamethrower" and left_held and not in_collection_phase)
+                if flame_archer_flame_active and now_ms - last_flame_archer_flame_tick_ms >= FLAME_THROWER_TICK_MS:
+                    last_flame_archer_flame_tick_ms = now_ms
+                    mx, my = get_mouse_pos()
+                    ang = math.atan2(my - player.centery, mx - player.centerx)
+                    half = FLAME_THROWER_CONE_ANGLE_RAD / 2
+                    dmg = max(1, int(arrow_damage * FLAME_THROWER_DMG_PER_TICK))
+                    for enemy in enemies:
+                        if enemy.hp <= 0:
+                            continue
+                        ex = enemy.rect.centerx - player.centerx
+                        ey = enemy.rect.centery - player.centery
+                        dist = math.hypot(ex, ey)
+                        if dist > FLAME_THROWER_CONE_RANGE:
+                            continue
+                        eang = math.atan2(ey, ex)
+                        diff = abs((eang - ang + math.pi) % (2 * math.pi) - math.pi)
+                        if diff <= half:
+                            deal_damage(enemy, dmg, ORANGE, ttl=800, vy=-0.5)
+                            enemy.burn_ms_left = max(enemy.burn_ms_left, FLAME_THROWER_BURN_MS)
+                            enemy.restart_status_tick(now_ms)
             else:
-                speed = player_speed * (Vampire.FLY_SPEED_MULT if vampire_fly else 1.0)
-                if isinstance(player_class, FlameArcher) and _player_in_flame_bomb_zone():
-                    speed *= 1.5
-                if keys[pygame.K_w]: player.y -= speed
-                if keys[pygame.K_s]: player.y += speed
-                if keys[pygame.K_a]: player.x -= speed
-                if keys[pygame.K_d]: player.x += speed
-        player.clamp_ip(screen.get_rect())
-
-        # Robber: hold-to-fire (AK) and minigun auto-fire
-        if isinstance(player_class, Robber):
-            mx, my = pygame.mouse.get_pos()
-            update_robber_guns(now_ms, mx, my, pygame.mouse.get_pressed()[0], False)
+                flame_archer_flame_active = False
+
+            # Assassin: init or refresh bounties on timer
+            if isinstance(player_class, Assassin):
+                if not assassin_active_bounties or now_ms >= assassin_bounty_refresh_at_ms:
+                    refresh_assassin_bounties()
+
+            # spawn preview
+            if spawn_preview_active and now_ms - spawn_preview_start_ms >= spawn_preview_ms:
+                spawn_preview_active = False
+                globals()["first_arrow_hit_this_wave"] = False
+                if wave % 20 == 0:
+                    spawn_boss()
+                else:
+                    spawn_wave(wave_enemy_count(enemies_per_wave))
 
-        # Flame Archer mastery: flamethrower in slot 3 (hold left mouse when selected)
-        if isinstance(player_class, FlameArcher) and flame_mastery_unlocked:
-            left_held = pygame.mouse.get_pressed()[0]
-            flame_archer_flame_active = (flame_archer_weapon == "flamethrower" and left_held and not in_collection_phase)
-            if flame_archer_flame_active and now_ms - last_flame_archer_flame_tick_ms >= FLAME_THROWER_TICK_MS:
-                last_flame_archer_flame_tick_ms = now_ms
-                mx, my = pygame.mouse.get_pos()
-                ang = math.atan2(my - player.centery, mx - player.centerx)
-                half = FLAME_THROWER_CONE_ANGLE_RAD / 2
-                dmg = max(1, int(arrow_damage * FLAME_THROWER_DMG_PER_TICK))
-                for enemy in enemies[:]:
-                    ex = enemy.rect.centerx - player.centerx
-                    ey = enemy.rect.centery - player.centery
-                    dist = math.hypot(ex, ey)
-                    if dist > FLAME_THROWER_CONE_RANGE:
-                        continue
-                    eang = math.atan2(ey, ex)
-                    diff = abs((eang - ang + math.pi) % (2 * math.pi) - math.pi)
-                    if diff <= half:
-                        enemy.hp -= dmg
-                        enemy.burn_ms_left = max(getattr(enemy, "burn_ms_left", 0), FLAME_THROWER_BURN_MS)
-                        enemy.last_status_tick = 0
-                        floating_texts.append({"x": enemy.rect.centerx, "y": enemy.rect.top - 12, "txt": f"-{dmg}", "color": ORANGE, "ttl": 800, "vy": -0.5, "alpha": 255})
-                        if enemy.hp <= 0:
-                            record_flame_mastery_progress(enemy, dot_final_blow=False)
-                            record_assassin_kill(enemy)
-                            score += 1
-                            spawn_orb(enemy.rect.centerx, enemy.rect.centery, amount=1)
-                            try: enemies.remove(enemy)
-                            except: pass
-        else:
-            flame_archer_flame_active = False
+            if frame_prof_on: frame_prof.mark("abilities")
 
-        # Assassin: init or refresh bounties on timer
-        if isinstance(player_class, Assassin):
-            if not assassin_active_bounties or now_ms >= assassin_bounty_refresh_at_ms:
-                refresh_assassin_bounties()
-
-        # spawn preview
-        if spawn_preview_active and now_ms - spawn_preview_start_ms >= spawn_preview_ms:
-            spawn_preview_active = False
-            globals()["first_arrow_hit_this_wave"] = False
-            if wave % 20 == 0:
-                spawn_boss()
-            else:
-                spawn_wave(max(1, int(round(enemies_per_wave * get_difficulty_count_mult()))))
-
-        # update arrows
-        for a in arrows[:]:
-            if not a.update():
-                try: arrows.remove(a)
-                except: pass
-
-        # remote arrows update
-        for ra in remote_arrows[:]:
-            if not ra.update(dt):
-                try: remote_arrows.remove(ra)
-                except: pass
-
-        # enemy arrows update
-        for ea in enemy_arrows[:]:
-            if not ea.update():
-                try: enemy_arrows.remove(ea)
-                except: pass
-
-        # Corrosive ability: damage enemies in field
-        if owned_abilities.get("Corrosive", False) and corrosive_level >= 1:
-            if now_ms - last_corrosive_damage_ms >= 500:
-                last_corrosive_damage_ms = now_ms
-                radius = CORROSIVE_BASE_RADIUS * (0.6 + 0.08 * min(corrosive_level, 5))
-                dmg = max(1, int(CORROSIVE_DPS * 0.5 * min(corrosive_level, 5)))
-                cx, cy = player.centerx, player.centery
-                i = len(enemies) - 1
-                while i >= 0:
-                    enemy = enemies[i]
-                    ex, ey = enemy.rect.centerx, enemy.rect.centery
-                    if math.hypot(ex - cx, ey - cy) <= radius:
-                        enemy.hp -= dmg
-                        floating_texts.append({"x": enemy.rect.centerx, "y": enemy.rect.top - 12, "txt": f"-{dmg}", "color": ACID_YELLOW, "ttl": 800, "vy": -0.5, "alpha": 255})
-                        if enemy.hp <= 0:
-                            record_assassin_kill(enemy)
-                            score += 1
-                            spawn_orb(enemy.rect.centerx, enemy.rect.centery, amount=1)
-                            del enemies[i]
+            # update arrows (reverse index; off-screen arrows go back to the pool)
+            i = len(arrows) - 1
+            while i >= 0:
+                if not arrows[i].update():
+                    release_arrow_at(i)
+                i -= 1
+
+            # remote arrows update
+            for ra in remote_arrows[:]:
+                if not ra.update(SIM_STEP_MS):
+                    try: remote_arrows.remove(ra)
+                    except: pass
+
+            # enemy arrows update
+            j = len(enemy_arrows) - 1
+            while j >= 0:
+                if not enemy_arrows[j].update():
+                    release_enemy_arrow_at(j)
+                j -= 1
+
+            if frame_prof_on: frame_prof.mark("projectiles")
+
+            # Corrosive ability: damage enemies in field
+            if owned_abilities.get("Corrosive", False) and corrosive_level >= 1:
+                if now_ms - last_corrosive_damage_ms >= 500:
+                    last_corrosive_damage_ms = now_ms
+                    radius = CORROSIVE_BASE_RADIUS * (0.6 + 0.08 * min(corrosive_level, 5))
+                    dmg = max(1, int(CORROSIVE_DPS * 0.5 * min(corrosive_level, 5)))
+                    cx, cy = player.centerx, player.centery
+                    for enemy in enemies:
+                        if enemy.hp > 0 and math.hypot(enemy.rect.centerx - cx, enemy.rect.centery - cy) <= radius:
+                            deal_damage(enemy, dmg, ACID_YELLOW, ttl=800, vy=-0.5, mastery_credit=False)
+
+            # Sword, Flame Bomb, flamethrower and Corrosive damage: text + kills in one pass
+            resolve_damage()
+
+            # status ticks, archer shots and boss attacks that are due this frame
+            run_enemy_timers(now_ms, assassin_invis)
+
+            # enemies update (reverse index iteration so we can delete without list copy)
+            i = len(enemies) - 1
+            while i >= 0:
+                enemy = enemies[i]
+                if not assassin_invis:
+                    if enemy.is_boss and boss_update_charge(enemy, now_ms):
+                        pass
+                    else:
+                        enemy.move_towards(player.centerx, player.centery)
+
+                if enemy.hp <= 0:
+                    enemy.alive = False
+                    emit_kill(enemy, dot_final_blow=enemy._killed_by_burn_dot)
+                    del enemies[i]
                     i -= 1
+                    continue
 
-        # enemies update (reverse index iteration so we can delete without list copy)
-        i = len(enemies) - 1
-        while i >= 0:
-            enemy = enemies[i]
-            if getattr(enemy, "is_boss", False):
-                boss_try_summon(enemy)
-                boss_try_shoot(enemy)
-                boss_try_slam(enemy, assassin_invis)
-                boss_try_charge(enemy)
-
-            if not assassin_invis:
-                proj = enemy.try_shoot(now_ms)
-                if proj:
-                    enemy_arrows.append(EnemyArrow(proj["rect"], proj["vx"], proj["vy"], proj["damage"]))
-
-            if not assassin_invis:
-                if getattr(enemy, "is_boss", False) and boss_update_charge(enemy, now_ms):
-                    pass
-                else:
-                    enemy.move_towards(player.centerx, player.centery)
-            enemy.apply_status(now_ms)
-
-            if enemy.hp <= 0:
-                record_flame_mastery_progress(enemy, dot_final_blow=getattr(enemy, "_killed_by_burn_dot", False))
-                record_assassin_kill(enemy)
-                score += 1
-                spawn_orb(enemy.rect.centerx, enemy.rect.centery, amount=1)
-                del enemies[i]
+                if player.colliderect(enemy.rect):
+                    if not vampire_fly and not assassin_invis:
+                        dmg = enemy.damage
+                        if isinstance(player_class, Knight):
+                            dmg = int(math.ceil(dmg * 0.90))
+                        if not admin_god_mode:
+                            player_hp -= dmg
+                        enemy.alive = False
+                        del enemies[i]
+                        if not admin_god_mode and player_hp <= 0:
+                            play_sound("death")
+                            daily_granted = try_grant_daily_reward()
+                            game_over_screen(daily_granted=daily_granted)
+                            reset_game()
+                            return
                 i -= 1
-                continue
-
-            if player.colliderect(enemy.rect):
-                if not vampire_fly and not assassin_invis:
-                    dmg = enemy.damage
+            rebuild_enemy_grid()
+
+            if frame_prof_on: frame_prof.mark("enemies")
+
+            # enemy arrows hit player (reverse index so we can delete without list copy)
+            j = len(enemy_arrows) - 1
+            while j >= 0:
+                ea = enemy_arrows[j]
+                hit_player = ea.hits(player)
+                if hit_player and not assassin_invis:
+                    if isinstance(player_class, Knight) and weapon == "sword":
+                        if player_class.try_deflect(ea):
+                            j -= 1
+                            continue
+                    dmg = ea.damage
                     if isinstance(player_class, Knight):
                         dmg = int(math.ceil(dmg * 0.90))
                     if not admin_god_mode:
                         player_hp -= dmg
-                    del enemies[i]
+                    release_enemy_arrow_at(j)
                     if not admin_god_mode and player_hp <= 0:
                         play_sound("death")
                         daily_granted = try_grant_daily_reward()
                         game_over_screen(daily_granted=daily_granted)
                         reset_game()
                         return
-            i -= 1
-
-        # enemy arrows hit player (reverse index so we can delete without list copy)
-        j = len(enemy_arrows) - 1
-        while j >= 0:
-            ea = enemy_arrows[j]
-            if player.colliderect(ea.rect) and not assassin_invis:
-                if isinstance(player_class, Knight) and weapon == "sword":
-                    if player_class.try_deflect(ea):
-                        j -= 1
-                        continue
-                dmg = ea.damage
-                if isinstance(player_class, Knight):
-                    dmg = int(math.ceil(dmg * 0.90))
-                if not admin_god_mode:
-                    player_hp -= dmg
-                del enemy_arrows[j]
-                if not admin_god_mode and player_hp <= 0:
-                    play_sound("death")
-                    daily_granted = try_grant_daily_reward()
-                    game_over_screen(daily_granted=daily_granted)
-                    reset_game()
-                    return
-            elif player.colliderect(ea.rect) and assassin_invis:
-                del enemy_arrows[j]
-            j -= 1
-
-        # player arrows hit enemies (use collidelist to avoid O(arrows*enemies) Python loop)
-        arrows_snapshot = list(arrows)
-        for a in arrows_snapshot:
-            if a not in arrows:
-                continue
-            enemy_rects = [e.rect for e in enemies]
-            idx = a.rect.collidelist(enemy_rects)
-            if idx >= 0:
-                enemy = enemies[idx]
-                dmg_override = getattr(a, "damage_override", None)
-                hit_dmg = dmg_override if dmg_override is not None else arrow_damage
-                handle_arrow_hit(enemy, hit_dmg)
-                if getattr(a, "pierce_remaining", 0) > 0:
-                    a.pierce_remaining -= 1
+                elif hit_player and assassin_invis:
+                    release_enemy_arrow_at(j)
+                j -= 1
+
+            # player arrows hit enemies (fast shots are swept along their last move so they can't tunnel;
+            # the rest take the plain collidelist inline, as first_hit would)
+            enemy_rects = None if _enemy_grid_active else [e.rect for e in enemies]
+            for ai, a in enumerate(arrows):
+                if enemy_rects is None:
+                    near = enemies_near_rect(a.sweep)
+                    idx = a.first_hit([e.rect for e in near])
                 else:
-                    try:
-                        arrows.remove(a)
-                    except ValueError:
-                        pass
-                break
+                    near = enemies
+                    idx = a.first_hit(enemy_rects) if a.swept else a.rect.collidelist(enemy_rects)
+                if idx >= 0:
+                    enemy = near[idx]
+                    hit_dmg = a.damage_override if a.damage_override is not None else arrow_damage
+                    handle_arrow_hit(enemy, hit_dmg)
+                    if a.pierce_remaining > 0:
+                        a.pierce_remaining -= 1
+                    else:
+                        release_arrow_at(ai)
+                    break
+            resolve_damage()
+            drain_kill_events()
 
-        # collection phase
-        if not enemies and not in_collection_phase and not spawn_preview_active:
-            in_collection_phase = True
-            collection_start_ms = pygame.time.get_ticks()
-
-        if in_collection_phase:
-            for orb in pending_orbs[:]:
-                dx = player.centerx - orb["x"]; dy = player.centery - orb["y"]
-                dist = math.hypot(dx,dy) or 1.0
-                speed = 4 + min(8, dist/20.0)
-                orb["x"] += (dx/dist)*speed
-                orb["y"] += (dy/dist)*speed
-                if math.hypot(orb["x"]-player.centerx, orb["y"]-player.centery) < 20:
-                    player_exp += orb["amount"]
-                    amt = max(1, int(round(orb["amount"] * daily_gem_mult())))
-                    gems += amt
-                    gems_this_run += amt
-                    if owned_abilities.get("Bounty", False) and random.random() < 0.25:
-                        gems += 1
-                        gems_this_run += 1
-                    if owned_abilities.get("Scavenger", False) and random.random() < 0.20:
-                        player_exp += 5
-                    try: pending_orbs.remove(orb)
-                    except: pass
+            if frame_prof_on: frame_prof.mark("collisions")
 
-            if pygame.time.get_ticks() - collection_start_ms >= collection_duration_ms:
-                for orb in pending_orbs[:]:
-                    player_exp += orb["amount"]
-                    amt = max(1, int(round(orb["amount"] * daily_gem_mult())))
-                    gems += amt
-                    gems_this_run += amt
-                    if owned_abilities.get("Bounty", False) and random.random() < 0.25:
-                        gems += 1
-                        gems_this_run += 1
-                    if owned_abilities.get("Scavenger", False) and random.random() < 0.20:
-                        player_exp += 5
-                    try: pending_orbs.remove(orb)
-                    except: pass
-                in_collection_phase = False
-
-                # Level up: excess EXP carries over to next level; multiple level-ups in one gain each get an ability choice
-                while player_exp >= exp_required:
-                    player_exp -= exp_required
-                    player_level += 1
-                    exp_required = 10 + 10 * (player_level - 1)
-                    play_sound("levelup")
-                    ability_choice_between_waves()
-
-                save_game()
-                spawn_preview_active = True
-                spawn_preview_start_ms = pygame.time.get_ticks()
-                player.center = (WIDTH//2, HEIGHT//2)
-                wave += 1
-                wave_banner_number = wave
-                wave_banner_until_ms = now_ms + 2200
-                # Refresh enemy count every boss wave; otherwise scale up (smoother cap)
-                ENEMIES_CAP = 70
-                if wave % 20 == 1:  # just finished a boss wave (wave 20, 40, ...)
-                    enemies_per_wave = DEFAULTS["enemies_per_wave_start"]
-                else:
-                    enemies_per_wave = min(ENEMIES_CAP, max(1, int(round(enemies_per_wave * 1.07))))
+            # collection phase
+            if not enemies and not in_collection_phase and not spawn_preview_active:
+                in_collection_phase = True
+                collection_start_ms = pygame.time.get_ticks()
+                if (wave + 1) % 20 != 0:
+                    prepare_wave_template(wave + 1, wave_enemy_count(enemies_per_wave_after(wave + 1, enemies_per_wave)))
+
+            if in_collection_phase:
+                collect_orbs(pending_orbs.pull(player.centerx, player.centery))
+
+                if pygame.time.get_ticks() - collection_start_ms >= collection_duration_ms:
+                    collect_orbs(pending_orbs.take_all())
+                    in_collection_phase = False
+
+                    # Level up: excess EXP carries over to next level; multiple level-ups in one gain each get an ability choice
+                    while player_exp >= exp_required:
+                        player_exp -= exp_required
+                        player_level += 1
+                        exp_required = 10 + 10 * (player_level - 1)
+                        play_sound("levelup")
+                        ability_choice_between_waves()
+                        rebuild_hit_pipeline()
+                        request_full_redraw()
+
+                    save_game()
+                    # the ability choice may have blocked: restart the clock and drop the queued steps
+                    now_ms = pygame.time.get_ticks()
+                    sim_accum = 0
+                    spawn_preview_active = True
+                    spawn_preview_start_ms = now_ms
+                    player.center = (WIDTH//2, HEIGHT//2)
+                    wave += 1
+                    wave_banner_number = wave
+                    wave_banner_until_ms = now_ms + 2200
+                    enemies_per_wave = enemies_per_wave_after(wave, enemies_per_wave)
+
+            if frame_prof_on: frame_prof.mark("collection")
 
         # ---------- DRAW ----------
-        screen.fill(bg_color)
+        shifts = interpolation_shifts(sim_accum / SIM_STEP_MS, player_prev)
+        for r, sx, sy in shifts:
+            r.move_ip(sx, sy)
+        banner_active = bool(wave_banner_until_ms and now_ms < wave_banner_until_ms)
+        tracked = DIRTY_RECTS and not frame_has_big_effects(banner_active)
+        # dt > 100: the loop was blocked (modal screen, stall) so the window may hold anything
+        dirty_frame = tracked and _dirty_prev_tracked and dt <= 100
+        if dirty_frame:
+            for r in _dirty_prev_rects:
+                screen.fill(bg_color, r)
+        else:
+            screen.fill(bg_color)
 
         # Wave banner (after clearing a wave) — fades out in last 0.4s
         if wave_banner_until_ms and now_ms < wave_banner_until_ms:
@@ -7750,7 +9113,7 @@ def game_loop():
                         pygame.draw.circle(ring2_surf, (255, 90, 30, ring2_alpha), (ring2_r + 4, ring2_r + 4), ring2_r, 3)
                         screen.blit(ring2_surf, (cx - ring2_r - 4, cy - ring2_r - 4))
             # Steady zone: gradient-style (inner brighter, outer dimmer)
-            alpha = min(100, 50 + flame_bomb_zone["ttl_ms"] // 80)
+            alpha = min(100, 50 + int(flame_bomb_zone["ttl_ms"]) // 80)
             big = rad * 2 + 20
             surf = pygame.Surface((big, big), pygame.SRCALPHA)
             # Outer glow
@@ -7781,7 +9144,7 @@ def game_loop():
 
         # weapon visuals (always visible; invisibility applies to character model only)
         if isinstance(player_class, Robber):
-            mx, my = pygame.mouse.get_pos()
+            mx, my = get_mouse_pos()
             ang = math.atan2(my - player.centery, mx - player.centerx)
             gun_len = 50
             tipx = int(player.centerx + gun_len * math.cos(ang))
@@ -7791,27 +9154,15 @@ def game_loop():
         elif weapon == "bow":
             # Flame Archer mastery slot 3: flamethrower (draw gun + cone when firing)
             if isinstance(player_class, FlameArcher) and flame_mastery_unlocked and flame_archer_weapon == "flamethrower":
-                mx, my = pygame.mouse.get_pos()
+                mx, my = get_mouse_pos()
                 ang = math.atan2(my - player.centery, mx - player.centerx)
                 gun_len = 50
                 tipx = int(player.centerx + gun_len * math.cos(ang))
                 tipy = int(player.centery + gun_len * math.sin(ang))
                 pygame.draw.line(screen, (200, 100, 0), (player.centerx, player.centery), (tipx, tipy), 5)
                 if flame_archer_flame_active:
-                    half = FLAME_THROWER_CONE_ANGLE_RAD / 2
-                    cx, cy = player.centerx, player.centery
-                    r = FLAME_THROWER_CONE_RANGE
-                    left_ang = ang - half
-                    right_ang = ang + half
-                    x1 = cx + r * math.cos(left_ang)
-                    y1 = cy + r * math.sin(left_ang)
-                    x2 = cx + r * math.cos(right_ang)
-                    y2 = cy + r * math.sin(right_ang)
-                    pts = [(cx, cy), (x1, y1), (x2, y2)]
-                    flame_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                    pygame.draw.polygon(flame_surf, (255, 140, 0, 140), pts)
-                    pygame.draw.polygon(flame_surf, (255, 200, 50, 90), [(cx, cy), (cx + 0.7*r*math.cos(left_ang), cy + 0.7*r*math.sin(left_ang)), (cx + 0.7*r*math.cos(right_ang), cy + 0.7*r*math.sin(right_ang))])
-                    screen.blit(flame_surf, (0, 0))
+                    cone_surf, (dx, dy) = flame_cone_surface(ang)
+                    screen.blit(cone_surf, (player.centerx + dx, player.centery + dy))
             else:
                 # Bow: same size for all (Flame Mastery keeps normal bow shape; amber color only when mastery)
                 is_mastery_bow = isinstance(player_class, FlameArcher) and flame_mastery_unlocked
@@ -7833,7 +9184,7 @@ def game_loop():
                 pygame.draw.line(screen, string_color, top, bottom, 4)
         elif isinstance(player_class, Knight) and weapon == "sword":
             # Knight only: sword/melee visual
-            mx, my = pygame.mouse.get_pos()
+            mx, my = get_mouse_pos()
             ang = math.atan2(my - player.centery, mx - player.centerx)
             tipx = player.centerx + DEFAULTS["sword_range"] * math.cos(ang)
             tipy = player.centery + DEFAULTS["sword_range"] * math.sin(ang)
@@ -7842,15 +9193,9 @@ def game_loop():
         # spawn preview red X markers
         if spawn_preview_active:
             preview_positions = spawn_pattern_positions[:int(enemies_per_wave)]
-            for (rx, ry) in preview_positions:
-                size = 34
-                rect = pygame.Rect(int(rx - size//2), int(ry - size//2), size, size)
-                s = pygame.Surface((size, size), pygame.SRCALPHA)
-                s.fill((200, 40, 40, 120))
-                screen.blit(s, rect.topleft)
-                pygame.draw.rect(screen, RED, rect, 3)
-                pygame.draw.line(screen, RED, (rect.left+6, rect.top+6), (rect.right-6, rect.bottom-6), 3)
-                pygame.draw.line(screen, RED, (rect.right-6, rect.top+6), (rect.left+6, rect.bottom-6), 3)
+            size = 34
+            marker = spawn_marker_surface(size)
+            screen.blits([(marker, (int(rx - size//2), int(ry - size//2))) for (rx, ry) in preview_positions], False)
 
         # local arrows
         for a in arrows:
@@ -7864,24 +9209,19 @@ def game_loop():
         for ea in enemy_arrows:
             ea.draw(screen)
 
-        # enemies (and burn/poison DoT indicators)
+        # enemies (one blits call from the enemy atlas) and burn/poison DoT indicators
+        screen.blits(enemy_atlas.blit_list(enemies), False)
         for enemy in enemies:
-            pygame.draw.rect(screen, enemy.color, enemy.rect)
+            if enemy.burn_ms_left <= 0 and enemy.poison_ms_left <= 0:
+                continue
             cx, top = enemy.rect.centerx, enemy.rect.top
-            if getattr(enemy, "burn_ms_left", 0) > 0:
+            if enemy.burn_ms_left > 0:
                 pygame.draw.circle(screen, ORANGE, (cx - 5, top - 5), 4)
-            if getattr(enemy, "poison_ms_left", 0) > 0:
+            if enemy.poison_ms_left > 0:
                 pygame.draw.circle(screen, PURPLE, (cx + 5, top - 5), 4)
 
         # orbs (small box when enemy dies — use small font for the number)
-        for orb in pending_orbs:
-            pygame.draw.rect(screen, BLUE, (int(orb["x"])-6, int(orb["y"])-6, 12, 12))
-            txt = FONT_XS.render(str(orb.get("amount", 1)), True, BLACK)
-            screen.blit(
-                txt,
-                (int(orb["x"]) - txt.get_width()//2,
-                 int(orb["y"]) - txt.get_height()//2)
-            )
+        pending_orbs.draw(screen)
 
         # HUD (slight background for readability)
         hud_max_w = WIDTH - 24
@@ -7889,83 +9229,77 @@ def game_loop():
             mod_names = " • ".join(m.get("name", "?") for m in daily_modifiers)
             daily_str = f"Daily Challenge: {mod_names}  (wave 5+ = +{DAILY_REWARD_GEMS} gems)"
             daily_fit = truncate_text_to_width(FONT_XS, daily_str, hud_max_w)
-            daily_txt = FONT_XS.render(daily_fit, True, (100, 80, 40))
+            daily_txt = hud_daily_label.render(FONT_XS, daily_fit, (100, 80, 40))
             screen.blit(daily_txt, (12, 12))
         hud_text = f"Score: {score}  Wave: {wave}  HP: {player_hp}  Dmg: {arrow_damage}  Gems: {gems}  Class: {player_class.name}"
         hud_text_fit = truncate_text_to_width(FONT_SM, hud_text, hud_max_w - 16)
-        hud = FONT_SM.render(hud_text_fit, True, BLACK)
-        hud_rect = pygame.Rect(10, 52, min(hud.get_width() + 16, hud_max_w), hud.get_height() + 8)
-        hud_bg = pygame.Surface((hud_rect.w, hud_rect.h), pygame.SRCALPHA)
-        hud_bg.fill((255, 255, 255, 200))
-        screen.blit(hud_bg, hud_rect.topleft)
-        pygame.draw.rect(screen, UI_BORDER_LIGHT, hud_rect, 2)
-        screen.blit(hud, (18, 56))
+        screen.blit(hud_panel_surface(hud_text_fit, hud_max_w), (10, 52))
         if isinstance(player_class, Vampire):
             if now_ms < vampire_fly_until_ms:
-                ability_txt = FONT_MD.render("Flying!", True, PURPLE)
+                ability_txt = hud_ability_label.render(FONT_MD, "Flying!", PURPLE)
             elif now_ms < vampire_fly_cooldown_until_ms:
                 sec = (vampire_fly_cooldown_until_ms - now_ms) // 1000
-                ability_txt = FONT_MD.render(f"V fly: {sec}s", True, DARK_GRAY)
+                ability_txt = hud_ability_label.render(FONT_MD, f"V fly: {sec}s", DARK_GRAY)
             else:
-                ability_txt = FONT_MD.render("V: Fly ready", True, GREEN)
+                ability_txt = hud_ability_label.render(FONT_MD, "V: Fly ready", GREEN)
             screen.blit(ability_txt, (12, 84))
         if isinstance(player_class, NoClass):
             if now_ms < archer_dash_until_ms:
-                ability_txt = FONT_MD.render("Dashing!", True, CYAN)
+                ability_txt = hud_ability_label.render(FONT_MD, "Dashing!", CYAN)
             elif now_ms < archer_dash_cooldown_until_ms:
                 sec = (archer_dash_cooldown_until_ms - now_ms) // 1000
-                ability_txt = FONT_MD.render(f"R dash: {sec}s", True, DARK_GRAY)
+                ability_txt = hud_ability_label.render(FONT_MD, f"R dash: {sec}s", DARK_GRAY)
             else:
-                ability_txt = FONT_MD.render("R: Dash ready", True, GREEN)
+                ability_txt = hud_ability_label.render(FONT_MD, "R: Dash ready", GREEN)
             screen.blit(ability_txt, (12, 84))
         if isinstance(player_class, Assassin):
             if now_ms < assassin_invis_until_ms:
-                ability_txt = FONT_MD.render("Invisible!", True, PURPLE)
+                ability_txt = hud_ability_label.render(FONT_MD, "Invisible!", PURPLE)
             elif now_ms < assassin_invis_cooldown_until_ms:
                 sec = (assassin_invis_cooldown_until_ms - now_ms) // 1000
-                ability_txt = FONT_MD.render(f"V invis: {sec}s", True, DARK_GRAY)
+                ability_txt = hud_ability_label.render(FONT_MD, f"V invis: {sec}s", DARK_GRAY)
             else:
-                ability_txt = FONT_MD.render("V: Invis ready", True, GREEN)
+                ability_txt = hud_ability_label.render(FONT_MD, "V: Invis ready", GREEN)
             screen.blit(ability_txt, (12, 84))
         if isinstance(player_class, Hacker):
-            ability_txt = FONT_SM.render("Terminal commands below", True, HACKER_TEXT_READY)
+            ability_txt = hud_ability_label.render(FONT_SM, "Terminal commands below", HACKER_TEXT_READY)
             screen.blit(ability_txt, (12, 84))
         if isinstance(player_class, MadScientist):
             if now_ms < mad_scientist_overcharge_until_ms:
-                ability_txt = FONT_MD.render("Overcharge!", True, (120, 255, 120))
+                ability_txt = hud_ability_label.render(FONT_MD, "Overcharge!", (120, 255, 120))
             elif now_ms < mad_scientist_overcharge_cooldown_until_ms:
                 sec = (mad_scientist_overcharge_cooldown_until_ms - now_ms) // 1000
-                ability_txt = FONT_MD.render(f"V overcharge: {sec}s", True, DARK_GRAY)
+                ability_txt = hud_ability_label.render(FONT_MD, f"V overcharge: {sec}s", DARK_GRAY)
             else:
-                ability_txt = FONT_MD.render("V: Overcharge ready", True, GREEN)
+                ability_txt = hud_ability_label.render(FONT_MD, "V: Overcharge ready", GREEN)
             screen.blit(ability_txt, (12, 84))
         if isinstance(player_class, FlameArcher) and flame_mastery_unlocked:
             ab_str = f"1:Bow  2:Flamethrower  F:Bomb  [{flame_archer_weapon}]"
-            ability_txt = FONT_SM.render(truncate_text_to_width(FONT_SM, ab_str, hud_max_w), True, BLACK)
+            ability_txt = hud_ability_label.render(FONT_SM, truncate_text_to_width(FONT_SM, ab_str, hud_max_w), BLACK)
             screen.blit(ability_txt, (12, 84))
         if isinstance(player_class, Robber):
             gun_names = {"ak47": "AK-47", "minigun": "Minigun", "shotgun": "Shotgun", "sniper": "Sniper"}
             g = robbers_gun
             ab_str = f"1:AK-47  2:Minigun  3:Shotgun  4:Sniper  [{gun_names.get(g, g)}]"
-            ability_txt = FONT_SM.render(truncate_text_to_width(FONT_SM, ab_str, hud_max_w), True, BLACK)
+            ability_txt = hud_ability_label.render(FONT_SM, truncate_text_to_width(FONT_SM, ab_str, hud_max_w), BLACK)
             screen.blit(ability_txt, (12, 84))
             if minigun_charge_start_ms and now_ms < minigun_charge_start_ms + ROBBER_MINIGUN_CHARGE_MS:
                 pct = min(100, int(100 * (now_ms - minigun_charge_start_ms) / ROBBER_MINIGUN_CHARGE_MS))
-                charge_txt = FONT_XS.render(f"Minigun charging {pct}%", True, ORANGE)
+                charge_txt = hud_status_label.render(FONT_XS, f"Minigun charging {pct}%", ORANGE)
                 screen.blit(charge_txt, (12, 108))
             elif minigun_firing_until_ms and now_ms < minigun_firing_until_ms:
-                charge_txt = FONT_XS.render("Minigun FIRING", True, RED)
+                charge_txt = hud_status_label.render(FONT_XS, "Minigun FIRING", RED)
                 screen.blit(charge_txt, (12, 108))
             elif minigun_overheat_until_ms and now_ms < minigun_overheat_until_ms:
                 sec = (minigun_overheat_until_ms - now_ms) / 1000.0
-                charge_txt = FONT_XS.render(f"Minigun cooling {sec:.1f}s", True, DARK_GRAY)
+                charge_txt = hud_status_label.render(FONT_XS, f"Minigun cooling {sec:.1f}s", DARK_GRAY)
                 screen.blit(charge_txt, (12, 108))
             if g == "shotgun":
                 if shotgun_reload_until_ms and now_ms < shotgun_reload_until_ms:
                     sec = (shotgun_reload_until_ms - now_ms) / 1000.0
-                    charge_txt = FONT_XS.render(f"Shotgun reloading {sec:.1f}s", True, ORANGE)
+                    charge_txt = hud_shotgun_label.render(FONT_XS, f"Shotgun reloading {sec:.1f}s", ORANGE)
                 else:
-                    charge_txt = FONT_XS.render(f"Shotgun {shotgun_shots_left}/{ROBBER_SHOTGUN_MAGAZINE}", True, BLACK)
+                    charge_txt = hud_shotgun_label.render(FONT_XS, f"Shotgun {shotgun_shots_left}/{ROBBER_SHOTGUN_MAGAZINE}", BLACK)
                 screen.blit(charge_txt, (12, 108))
 
         # Hit List button (Assassin only)
@@ -7973,18 +9307,18 @@ def game_loop():
         hitlist_btn = pygame.Rect(WIDTH - 230, hud_bottom_y, 100, 40)
         save_btn = pygame.Rect(WIDTH - 120, hud_bottom_y, 100, 40)
         admin_btn = pygame.Rect(12, HEIGHT - 32, 52, 24)
-        mx_hud, my_hud = pygame.mouse.get_pos()
+        mx_hud, my_hud = get_mouse_pos()
         if isinstance(player_class, Assassin):
             draw_button(hitlist_btn, "Hit List", font=FONT_SM, hover=hitlist_btn.collidepoint(mx_hud, my_hud))
         draw_button(save_btn, "Save", font=FONT_SM, hover=save_btn.collidepoint(mx_hud, my_hud))
         # Admin link (click to open panel instead of typing code)
         admin_hover = admin_btn.collidepoint(mx_hud, my_hud)
         admin_color = (180, 200, 180) if admin_hover else (120, 140, 120)
-        admin_surf = FONT_XS.render("Admin", True, admin_color)
+        admin_surf = hud_admin_label.render(FONT_XS, "Admin", admin_color)
         screen.blit(admin_surf, (admin_btn.x, admin_btn.y + (admin_btn.h - admin_surf.get_height()) // 2))
 
         for e in enemies:
-            if getattr(e, "is_boss", False):
+            if e.is_boss:
                 draw_boss_bar(e)
                 break
         if isinstance(player_class, Hacker):
@@ -7992,12 +9326,199 @@ def game_loop():
         draw_hp_bar(player_hp)
         draw_exp_bar()
 
+        if frame_prof_on: frame_prof.mark("draw")
+
         # FX + chat overlay
         draw_fx(screen)
         draw_chat(screen)
-        pygame.display.flip()
+        if frame_prof_on:
+            frame_prof.draw(screen)
+            frame_prof.mark("fx")
+        present_frame(tracked, dirty_frame)
+        for r, sx, sy in shifts:
+            r.move_ip(-sx, -sy)
+        if frame_prof_on:
+            frame_prof.mark("flip")
+            frame_prof.end()
+
+# ---------- BENCHMARK ----------
+# python game.py --benchmark runs headless micro-benchmarks and prints the results, then exits.
+def _bench_best(fn, repeat=5):
+    """Best wall time of fn() over repeat runs, in seconds."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        if best is None or dt < best:
+            best = dt
+    return best
+
+class _DictEnemy:
+    # The fields Enemy carries, stored in a per-instance __dict__ (the layout before __slots__).
+    # Standalone on purpose: subclassing Enemy would put every field back into its slots.
+    def __init__(self, rect, etype="normal"):
+        self.rect = rect
+        self.etype = etype
+        self.is_mini = False
+        self.color = CYAN
+        self.speed = 2
+        self.hp = 36
+        self.damage = 8
+        self.max_hp = self.hp
+        self.burn_ms_left = 0
+        self.poison_ms_left = 0
+        self.slow_until_ms = 0
+        self.slowed = False
+        self.next_status_ms = 0
+        self.alive = True
+        self.shoot_timer = 0
+        self.shoot_interval = 1800 + random.randint(-400,400)
+        self._killed_by_burn_dot = False
+        self._mastery_credit = True
+        self.px, self.py = rect.x, rect.y
+        self.is_boss = False
+
+def _bench_enemy_layout(n=5000):
+    import tracemalloc
+    rect = pygame.Rect(0, 0, 30, 30)
+    rows = []
+    for label, cls in (("dict", _DictEnemy), ("slots", Enemy)):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        objs = [cls(rect, "archer") for _ in range(n)]
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        def read_fields():
+            for e in objs:
+                e.hp; e.burn_ms_left; e.poison_ms_left
+
+        def read_is_boss():
+            # instance attribute for dict, class attribute for slots
+            for e in objs:
+                e.is_boss; e.is_boss; e.is_boss
+
+        def read_getattr():
+            for e in objs:
+                getattr(e, "hp", 0); getattr(e, "burn_ms_left", 0); getattr(e, "poison_ms_left", 0)
+
+        per_read = 1e9 / (3 * n)
+        rows.append((label, size / n, _bench_best(read_fields) * per_read, _bench_best(read_is_boss) * per_read,
+                     _bench_best(read_getattr) * per_read))
+    print(f"Enemy layout ({n} enemies):")
+    print(f"  {'layout':<8} {'bytes/enemy':>12} {'field ns':>9} {'is_boss ns':>11} {'getattr ns':>11}")
+    for label, per, field_ns, boss_ns, getattr_ns in rows:
+        print(f"  {label:<8} {per:12.0f} {field_ns:9.1f} {boss_ns:11.1f} {getattr_ns:11.1f}")
+
+def _bench_arrow_collision(n_arrows=60, n_enemies=50, frames=200):
+    rng = random.Random(1)
+    enemy_rects = [pygame.Rect(rng.randrange(WIDTH), rng.randrange(HEIGHT), 30, 30) for _ in range(n_enemies)]
+    shots = [Arrow(rng.randrange(WIDTH), rng.randrange(HEIGHT), rng.randrange(WIDTH), rng.randrange(HEIGHT)) for _ in range(n_arrows)]
+    fast = [Arrow(rng.randrange(WIDTH), rng.randrange(HEIGHT), rng.randrange(WIDTH), rng.randrange(HEIGHT)) for _ in range(n_arrows)]
+    for a in fast:
+        a.vx *= 2.5
+        a.vy *= 2.5
+        a.swept = needs_sweep(a.vx, a.vy)
+    for a in shots + fast:
+        a.update()
+    # Bow arrows step 18 px (no sweep needed); fast movers step 45 px and take the swept test
+    touching = [a for a in shots if a.rect.collidelist(enemy_rects) >= 0]
+    fast_touching = [a for a in fast if a.sweep.collidelist(enemy_rects) >= 0]
+
+    def discrete(group):
+        def run():
+            for _ in range(frames):
+                for a in group:
+                    a.rect.collidelist(enemy_rects)
+        return run
+
+    def swept(group):
+        # as game_loop calls it
+        def run():
+            for _ in range(frames):
+                for a in group:
+                    a.first_hit(enemy_rects) if a.swept else a.rect.collidelist(enemy_rects)
+        return run
+
+    print(f"Arrow vs enemy collision ({n_arrows} arrows, {n_enemies} enemies):")
+    for label, group in (("all", shots), ("hit", touching), ("fast, all", fast), ("fast, broadphase hit", fast_touching)):
+        if not group:
+            continue
+        per = frames * len(group)
+        print(f"  {label + ' (' + str(len(group)) + ')':<26} discrete {_bench_best(discrete(group)) / per * 1e6:6.2f} us/arrow"
+              f"   swept {_bench_best(swept(group)) / per * 1e6:6.2f} us/arrow")
+
+def _bench_horde(n_enemies=2000, n_arrows=100, frames=20):
+    """Horde-sized wave: enemy grid vs full scans, and the atlas vs one draw.rect per enemy."""
+    rng = random.Random(1)
+    positions = [(rng.randrange(WIDTH), rng.randrange(HEIGHT)) for _ in range(n_enemies)]
+    saved = list(enemies)
+    enemies[:] = build_wave_enemies(25, positions)
+    shots = [Arrow(rng.randrange(WIDTH), rng.randrange(HEIGHT), rng.randrange(WIDTH), rng.randrange(HEIGHT)) for _ in range(n_arrows)]
+    for a in shots:
+        a.update()
+    probes = positions[:n_arrows]
+    target = pygame.Surface((WIDTH, HEIGHT))
+
+    def scan_arrows():
+        for _ in range(frames):
+            rects = [e.rect for e in enemies]
+            for a in shots:
+                a.first_hit(rects)
+
+    def grid_arrows():
+        for _ in range(frames):
+            rebuild_enemy_grid()
+            for a in shots:
+                a.first_hit([e.rect for e in enemies_near_rect(a.sweep)])
+
+    def splash(radius=65):
+        for _ in range(frames):
+            for x, y in probes:
+                for e in enemies_near(x, y, radius):
+                    math.hypot(e.rect.centerx - x, e.rect.centery - y) <= radius
+
+    def nearest():
+        for _ in range(frames):
+            for x, y in probes:
+                nearest_enemies(x, y, 2)
+
+    def draw_rects():
+        for _ in range(frames):
+            for e in enemies:
+                pygame.draw.rect(target, e.color, e.rect)
+
+    def draw_atlas():
+        for _ in range(frames):
+            target.blits(enemy_atlas.blit_list(enemies), False)
+
+    rows = []
+    try:
+        rebuild_enemy_grid()
+        grid_on = _enemy_grid_active
+        globals()["_enemy_grid_active"] = False
+        rows += [("arrows, full scan", scan_arrows), ("splash, full scan", splash), ("nearest, full scan", nearest)]
+        rows = [(label, _bench_best(fn)) for label, fn in rows]
+        globals()["_enemy_grid_active"] = grid_on
+        for label, fn in (("arrows, grid", grid_arrows), ("splash, grid", splash), ("nearest, grid", nearest),
+                          ("draw.rect per enemy", draw_rects), ("atlas blits", draw_atlas)):
+            rows.append((label, _bench_best(fn)))
+    finally:
+        clear_enemies()
+        enemies.extend(saved)
+    print(f"Horde wave ({n_enemies} enemies, {n_arrows} arrows/probes):")
+    for label, t in rows:
+        print(f"  {label:<22} {t / frames * 1e3:8.2f} ms/frame")
+
+def run_benchmark():
+    _bench_enemy_layout()
+    _bench_arrow_collision()
+    _bench_horde()
 
 # ---------- ENTRY ----------
+startup_mark("module definitions")
+
 if __name__ == "__main__":
     if "--server" in sys.argv:
         if websockets is None:
@@ -8005,11 +9526,16 @@ if __name__ == "__main__":
             sys.exit(1)
         asyncio.run(run_server("0.0.0.0", 8765, 20))
         sys.exit(0)
+    if "--benchmark" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
     reset_game()
-    if not (settings.get("player_name") or "").strip():
-        name_entry_screen()
-    if not settings.get("tutorial_completed", False):
-        tutorial_screen()
+    startup_mark("reset_game")
+    if not PROFILE_STARTUP:
+        if not (settings.get("player_name") or "").strip():
+            name_entry_screen()
+        if not settings.get("tutorial_completed", False):
+            tutorial_screen()
     while True:
         choice = main_menu()
         if choice == "resume":